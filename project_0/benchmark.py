@@ -0,0 +1,235 @@
+"""
+Benchmark of game kernels for game 'Guess number'.
+
+Measures games per second, nanoseconds per guess and peak memory
+for each kernel mode (scalar, batch, sampling, exact) and for
+the score_game harness over ranges and test numbers of different scales.
+Results are saved in JSON for tracking regressions.
+
+Usage:
+    python benchmark.py --output benchmark_results.json
+    python benchmark.py --max-range-power 6 --max-tests-power 5
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+from game_kernel import score_game, stream_attempts, get_exact_attempts, \
+    random_predict, random_predict_range_dividing, predict_division_two
+
+# Expected number of guesses in one game for range size n
+expected_guesses = {
+    'random_predict': lambda n: n,
+    'random_predict_range_dividing': lambda n: 2*np.log(n) + 1,
+    'predict_division_two': lambda n: np.log2(n),
+}
+
+def measure(func:callable, *args, setup:callable=None, **kwargs) -> tuple:
+    """Call function with time and peak memory measuring. 
+    tracemalloc slows down allocations, so time is measured in the first 
+    call and peak memory - in the second call under tracemalloc
+
+    Args:
+        func (callable): Measured function
+        setup (callable, optional): Called before each call, e.g. to clear 
+            caches. Defaults to None.
+
+    Returns:
+        tuple: (function result, elapsed time in s, peak memory in bytes)
+    """
+    # Hide printed results of the measured functions
+    with contextlib.redirect_stdout(io.StringIO()):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+        
+        if setup is not None:
+            setup()
+        tracemalloc.start()
+        func(*args, **kwargs)
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return result, elapsed, peak_memory
+
+
+def bench_kernel(test_kernel:callable, mode:str, min_val:int, max_val:int, \
+    test_number:int, chunk_size:int=2**20) -> dict:
+    """Benchmark one kernel mode
+
+    Args:
+        test_kernel (callable): Tested guess function
+        mode (str): Kernel mode:
+            'scalar' - kernel is called for each number;
+            'batch' - batched version of the kernel (including 
+                lockstep one, see get_batch_kernel);
+            'sampling' - sampling version of the kernel;
+            'exact' - exact evaluation over all numbers in range.
+        min_val (int): Minimum value of guess number
+        max_val (int): Maximum value of guess number
+        test_number (int): Number of tests
+        chunk_size (int): Count of tests in chunk. Defaults to 2**20.
+
+    Returns:
+        dict: Benchmark record
+    """
+    if mode == 'exact':
+        exact_attempts, elapsed, peak_memory = measure(
+            get_exact_attempts, test_kernel, min_val, max_val,
+            setup=get_exact_attempts.cache_clear
+        )
+        games = max_val - min_val + 1
+        guesses = exact_attempts['mean'] * games
+    else:
+        attempts_stats, elapsed, peak_memory = measure(
+            stream_attempts, test_kernel, test_number,
+            min_val=min_val, max_val=max_val, chunk_size=chunk_size,
+            use_batch=('lockstep' if mode != 'scalar' else False),
+            use_sampling=(mode == 'sampling')
+        )
+        games = test_number
+        guesses = attempts_stats.mean * attempts_stats.count
+
+    return {
+        'target': test_kernel.__name__,
+        'mode': mode,
+        'min_val': min_val,
+        'max_val': max_val,
+        'test_number': test_number,
+        'seconds': elapsed,
+        'games_per_second': games / elapsed,
+        'ns_per_guess': elapsed / guesses * 1e9,
+        'peak_memory_bytes': peak_memory,
+    }
+
+
+def bench_score_game(test_kernel:callable, min_val:int, max_val:int, \
+    test_number:int, **score_kwargs) -> dict:
+    """Benchmark score_game harness with the kernel. Games are played: 
+    exact evaluation of deterministic kernels is benchmarked 
+    by bench_kernel in 'exact' mode
+
+    Args:
+        test_kernel (callable): Tested guess function
+        min_val (int): Minimum value of guess number
+        max_val (int): Maximum value of guess number
+        test_number (int): Number of tests
+
+    Returns:
+        dict: Benchmark record
+    """
+    score_game_kernel = score_game(test_number, use_exact=False, \
+        **score_kwargs)(test_kernel)
+    _, elapsed, peak_memory = measure(
+        score_game_kernel, min_val=min_val, max_val=max_val
+    )
+    return {
+        'target': 'score_game',
+        'mode': test_kernel.__name__,
+        'min_val': min_val,
+        'max_val': max_val,
+        'test_number': test_number,
+        'seconds': elapsed,
+        'games_per_second': test_number / elapsed,
+        'ns_per_guess': None,
+        'peak_memory_bytes': peak_memory,
+    }
+
+
+def run_benchmark(range_powers:list, tests_powers:list, \
+    max_guesses:float=1e9, max_scalar_guesses:float=1e7, \
+    chunk_size:int=2**20, verbose:bool=True) -> list:
+    """Run benchmark for all kernels, modes, ranges and test numbers.
+    Cases with expected number of guesses more than max_guesses
+    are skipped.
+
+    Args:
+        range_powers (list): Powers of 10 for range [1, 10**power]
+        tests_powers (list): Powers of 10 for test number
+        max_guesses (float): Maximum expected number of guesses in case.
+            Defaults to 1e9.
+        max_scalar_guesses (float): Maximum expected number of guesses
+            in case for the scalar mode. Defaults to 1e7.
+        chunk_size (int): Count of tests in chunk. Defaults to 2**20.
+        verbose (bool): Print records. Defaults to True.
+
+    Returns:
+        list: Benchmark records
+    """
+    kernels = [random_predict, random_predict_range_dividing,
+               predict_division_two]
+    results = []
+
+    for range_power in range_powers:
+        min_val, max_val = 1, 10**range_power
+        for test_kernel in kernels:
+            guesses_per_game = expected_guesses[test_kernel.__name__](max_val)
+            modes = ['scalar', 'batch']
+            if hasattr(test_kernel, 'sample_kernel'):
+                modes.append('sampling')
+            for tests_power in tests_powers:
+                test_number = 10**tests_power
+                for mode in modes:
+                    if mode == 'scalar' \
+                        and test_number * guesses_per_game > max_scalar_guesses:
+                        continue
+                    if mode != 'sampling' \
+                        and test_number * guesses_per_game > max_guesses:
+                        continue
+                    results.append(bench_kernel(test_kernel, mode,
+                        min_val, max_val, test_number, chunk_size))
+                    if verbose:
+                        print(results[-1])
+                # Harness with streaming for the fastest kernel mode
+                if 'sampling' in modes \
+                    or test_number * guesses_per_game <= max_guesses:
+                    results.append(bench_score_game(test_kernel, min_val,
+                        max_val, test_number, use_batch='lockstep',
+                        use_sampling=True, chunk_size=chunk_size))
+                    if verbose:
+                        print(results[-1])
+            if hasattr(test_kernel, 'attempts_distribution'):
+                results.append(bench_kernel(test_kernel, 'exact',
+                    min_val, max_val, None))
+                if verbose:
+                    print(results[-1])
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark game kernels')
+    parser.add_argument('--output', default='benchmark_results.json',
+                        help='Path of JSON with results')
+    parser.add_argument('--min-range-power', type=int, default=2)
+    parser.add_argument('--max-range-power', type=int, default=12)
+    parser.add_argument('--min-tests-power', type=int, default=3)
+    parser.add_argument('--max-tests-power', type=int, default=8)
+    parser.add_argument('--max-guesses', type=float, default=1e9,
+                        help='Skip cases with more expected guesses')
+    parser.add_argument('--chunk-size', type=int, default=2**20)
+    args = parser.parse_args()
+
+    results = run_benchmark(
+        range(args.min_range_power, args.max_range_power+1, 2),
+        range(args.min_tests_power, args.max_tests_power+1),
+        max_guesses=args.max_guesses, chunk_size=args.chunk_size,
+    )
+    report = {
+        'created': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'results': results,
+    }
+    with open(args.output, 'w') as json_file:
+        json.dump(report, json_file, indent=2)
+    print(f'Results saved to {args.output}')
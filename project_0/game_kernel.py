@@ -7,12 +7,36 @@ Further it can be an attribute of game_kernel class.
 """
 
 import numpy as np
+import time
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
 
-def score_game(test_number:int=1000) -> callable:
+def score_game(test_number:int=1000, use_batch:bool=True, \
+    use_exact:bool=True, use_sampling:bool=False, \
+    chunk_size:int=None, instrument:bool=False) -> callable:
     """Decorator for game kernels tests up to test_number times
 
     Args:
         test_number (int): Number of necessary tests. Defaults to 1000.
+        use_batch (bool or str): Use batched version of the kernel 
+            (see get_batch_kernel): True - attribute "batch_kernel", 
+            which gives the same attempts as the kernel; 'lockstep' - 
+            also attribute "lockstep_kernel", which gives the same 
+            distribution of attempts only. Otherwise kernel is called 
+            for each test number. Defaults to True.
+        use_exact (bool): For deterministic kernels (attribute 
+            "attempts_distribution") get exact mean number of attempts 
+            over all numbers in range instead of tests. Defaults to True.
+        use_sampling (bool): Draw number of attempts from its 
+            distribution by the sampling version of the kernel (attribute 
+            "sample_kernel"), if it exists. Defaults to False.
+        chunk_size (int, optional): If set, guess numbers are generated 
+            and tested by chunks of chunk_size numbers with running 
+            statistics, so memory does not depend on test_number. 
+            Defaults to None.
+        instrument (bool): Collect wall time, RNG calls, comparisons and 
+            attempts histogram and return them as ScoreResult instead of 
+            printing the score. Defaults to False.
 
     Returns:
         callable: Function for testing game kernel
@@ -52,48 +76,119 @@ def score_game(test_number:int=1000) -> callable:
                     Defaults to 100.
 
             Returns:
-                int: Mean number of attempts
+                int: Mean number of attempts. ScoreResult, if instrument 
+                    is True
             """
             
+            # Instrumentation counters. None, if it is disabled
+            counters = {} if instrument else None
+            if instrument:
+                start_time = time.perf_counter()
+            attempts_stats = None
+            
             # Prepare result-mode for displaying
             if test_number == 1:
                 res_type_str = ' '
             else:
                 res_type_str = ' on average '
             
-            # Get array of guess numbers
             if guess_number is None:
-                np.random.seed(1) # Fix seed for repeatability
-                number_array = np.random.randint(min_val, max_val+1, \
-                    size=(test_number))
                 if test_number == 1:
                     num_type_str = 'a random number'
                 else:
                     num_type_str = 'random numbers'
             else:
-                number_array = np.full(test_number, guess_number)
                 num_type_str = 'your number'
             
-            # Calculating mean count of attempts for test_number tests
-            attempts_numbers = []
-            for number in number_array:
-                current_attempts = test_kernel(number, min_val, \
+            if use_sampling and hasattr(test_kernel, 'sample_kernel'):
+                mode = 'sampling'
+            elif get_batch_kernel(test_kernel, use_batch) is not None:
+                mode = 'batch'
+            else:
+                mode = 'scalar'
+            
+            # Deterministic kernel: get exact result without tests
+            exact_attempts = None
+            if use_exact and hasattr(test_kernel, 'attempts_distribution'):
+                exact_attempts = get_exact_attempts(test_kernel, min_val, \
                     max_val)
-                # Check result correctness
-                try:
-                    if current_attempts:
-                        attempts_numbers.append(current_attempts)
+                if exact_attempts is None:
+                    return
+                if instrument:
+                    # Games are not played
+                    counters['kernel_time'] = time.perf_counter() - start_time
+                    counters['rng_calls'] = 0
+                    counters['comparisons'] = 0
+            
+            if exact_attempts is not None and guess_number is None:
+                mode = 'exact'
+                score = int(exact_attempts['mean'])
+                result_str = (f'{test_kernel.__name__} guesses all numbers ' 
+                    + f'in range [{min_val}, {max_val}] on average in '
+                    + f'{score} attempts. Exact evaluation over '
+                    + f'{max_val-min_val+1} numbers')
+                if instrument:
+                    distribution = exact_attempts['distribution']
+                    attempts_stats = get_attempts_stats(
+                        np.array(list(distribution.keys())), 
+                        np.array(list(distribution.values()))
+                    )
+            elif exact_attempts is not None \
+                and exact_attempts['table'] is not None \
+                and min_val <= guess_number <= max_val:
+                mode = 'exact'
+                score = int(exact_attempts['table'][guess_number-min_val])
+                result_str = (f'{test_kernel.__name__} guesses your number ' 
+                    + f'in range [{min_val}, {max_val}] in '
+                    + f'{score} attempts. Exact evaluation')
+                if instrument:
+                    attempts_stats = get_attempts_stats(
+                        np.array([score]), np.array([test_number])
+                    )
+            else:
+                if chunk_size is not None:
+                    # Calculating mean count of attempts chunk by chunk
+                    attempts_stats = stream_attempts(test_kernel, \
+                        test_number, guess_number, min_val, max_val, \
+                        chunk_size=chunk_size, use_batch=use_batch, \
+                        use_sampling=use_sampling, counters=counters)
+                    if attempts_stats is None:
+                        return
+                    score = int(attempts_stats.mean)
+                else:
+                    # Get array of guess numbers
+                    if instrument:
+                        numbers_start_time = time.perf_counter()
+                    if guess_number is None:
+                        np.random.seed(1) # Fix seed for repeatability
+                        number_array = random_numbers(min_val, max_val, \
+                            test_number)
                     else:
-                        raise ValueError('Get 0 or None')
-                except ValueError as e:
-                    print(e)
-                    return          
-            score = int(np.mean(attempts_numbers))
+                        number_array = np.full(test_number, guess_number)
+                    if instrument:
+                        counters['numbers_time'] = time.perf_counter() \
+                            - numbers_start_time
+                    
+                    # Calculating mean count of attempts for test_number tests
+                    attempts_numbers = get_attempts(test_kernel, \
+                        number_array, min_val, max_val, use_batch=use_batch, \
+                        use_sampling=use_sampling, counters=counters)
+                    if attempts_numbers is None:
+                        return
+                    score = int(np.mean(attempts_numbers))
+                    if instrument:
+                        attempts_stats = get_attempts_stats(attempts_numbers)
+                
+                result_str = (f'{test_kernel.__name__} guesses {num_type_str} ' 
+                    + f'in range [{min_val}, {max_val}]{res_type_str}in ' 
+                    + f'{score} attempts. Total count of tests: {test_number}')
             
-            print(f'{test_kernel.__name__} guesses {num_type_str} ' 
-                  + f'in range [{min_val}, {max_val}]{res_type_str}in ' 
-                  + f'{score} attempts. Total count of tests: {test_number}')
+            if instrument:
+                counters['total_time'] = time.perf_counter() - start_time
+                return ScoreResult(test_kernel.__name__, mode, min_val, \
+                    max_val, score, attempts_stats, counters)
             
+            print(result_str)
             return score
         
         return score_game_kernel
@@ -101,6 +196,461 @@ def score_game(test_number:int=1000) -> callable:
     return test_kernel_decorator
 
 
+def get_batch_kernel(test_kernel:callable, use_batch=True) -> callable:
+    """Get batched version of the kernel. 
+    Kernel of "batch_kernel" attribute gives the same attempts as 
+    the kernel for the same seed. Kernel of "lockstep_kernel" attribute 
+    takes random numbers in the other order, so it gives the same 
+    distribution of attempts only, and it is used on request.
+
+    Args:
+        test_kernel (callable): Tested guess function
+        use_batch (bool or str): True - "batch_kernel"; 'lockstep' - 
+            "batch_kernel" or "lockstep_kernel"; False - no batched 
+            kernel. Defaults to True.
+
+    Returns:
+        callable: Batched kernel. None, if it does not exist
+    """
+    if not use_batch:
+        return None
+    batch_kernel = getattr(test_kernel, 'batch_kernel', None)
+    if batch_kernel is None and use_batch == 'lockstep':
+        batch_kernel = getattr(test_kernel, 'lockstep_kernel', None)
+    return batch_kernel
+
+
+def get_attempts(test_kernel:callable, number_array:np.ndarray, \
+    min_val:int=1, max_val:int=100, use_batch:bool=True, \
+    use_sampling:bool=False, counters:dict=None) -> np.ndarray:
+    """Get number of attempts for each number of number_array. 
+    Sampling or batched version of the kernel is used if it exists (see 
+    "sample_kernel" attribute and get_batch_kernel), otherwise the kernel 
+    is called for each number.
+
+    Args:
+        test_kernel (callable): Tested guess function
+        number_array (np.ndarray): Numbers for guessing
+        min_val (int, optional): Minimum value of guess number. 
+            Defaults to 1.
+        max_val (int, optional): Maximum value of guess number. 
+            Defaults to 100.
+        use_batch (bool or str): Use batched version of the kernel 
+            (see get_batch_kernel). Defaults to True.
+        use_sampling (bool): Use sampling version of the kernel. 
+            Defaults to False.
+        counters (dict, optional): Instrumentation counters. Kernel time 
+            is added to "kernel_time", RNG calls and comparisons reported 
+            by the batched kernel - to "rng_calls" and "comparisons". 
+            Batched kernel must accept "counters" argument to be 
+            instrumented. Defaults to None - no instrumentation.
+
+    Returns:
+        np.ndarray: Number of attempts for each number. 
+            None, if some kernel result is incorrect
+    """
+    
+    if use_sampling and hasattr(test_kernel, 'sample_kernel'):
+        batch_kernel = test_kernel.sample_kernel
+    else:
+        batch_kernel = get_batch_kernel(test_kernel, use_batch)
+    
+    if counters is not None:
+        start_time = time.perf_counter()
+    
+    if batch_kernel is not None:
+        if counters is None:
+            attempts_numbers = batch_kernel(number_array, min_val, max_val)
+        else:
+            attempts_numbers = batch_kernel(number_array, min_val, max_val, \
+                counters=counters)
+        # Check result correctness
+        try:
+            if attempts_numbers is None or not attempts_numbers.all():
+                raise ValueError('Get 0 or None')
+        except ValueError as e:
+            print(e)
+            return
+    else:
+        # Fallback: play games one by one
+        attempts_numbers = np.empty(len(number_array), dtype=np.int64)
+        for i, number in enumerate(number_array):
+            current_attempts = test_kernel(number, min_val, max_val)
+            # Check result correctness
+            try:
+                if current_attempts:
+                    attempts_numbers[i] = current_attempts
+                else:
+                    raise ValueError('Get 0 or None')
+            except ValueError as e:
+                print(e)
+                return
+        if counters is not None:
+            # Each attempt has one more/less comparison
+            add_counter(counters, 'comparisons', int(attempts_numbers.sum()))
+    
+    if counters is not None:
+        add_counter(counters, 'kernel_time', time.perf_counter() - start_time)
+    return attempts_numbers
+
+
+def add_counter(counters:dict, name:str, value:float):
+    """Add value to the instrumentation counter
+
+    Args:
+        counters (dict): Instrumentation counters
+        name (str): Counter name
+        value (float): Added value
+    """
+    counters[name] = counters.get(name, 0) + value
+
+
+class ScoreResult():
+    def __init__(self, kernel_name:str, mode:str, min_val:int, max_val:int, \
+        score:int, attempts_stats:'AttemptsStats', counters:dict):
+        """Result of the instrumented score_game
+
+        Args:
+            kernel_name (str): Name of the tested guess function
+            mode (str): Mode of the kernel evaluation: 'exact', 'sampling', 
+                'batch' or 'scalar'
+            min_val (int): Minimum value of guess number
+            max_val (int): Maximum value of guess number
+            score (int): Mean number of attempts (int-truncated)
+            attempts_stats (AttemptsStats): Statistics and histogram 
+                of attempts
+            counters (dict): Instrumentation counters
+        """
+        self.kernel_name = kernel_name
+        self.mode = mode
+        self.min_val = min_val
+        self.max_val = max_val
+        self.score = score
+        self.attempts_stats = attempts_stats
+        self.test_number = attempts_stats.count
+        self.mean = attempts_stats.mean
+        self.histogram = attempts_stats.histogram
+        # Wall time in seconds
+        self.wall_time = {
+            'numbers': counters.get('numbers_time', 0.0),
+            'kernel': counters.get('kernel_time', 0.0),
+            'total': counters.get('total_time', 0.0),
+        }
+        # None, if kernel does not report the counter
+        self.rng_calls = counters.get('rng_calls')
+        self.comparisons = counters.get('comparisons')
+    
+    
+    def __repr__(self):
+        return (f'ScoreResult(kernel={self.kernel_name}, mode={self.mode}, '
+                + f'range=[{self.min_val}, {self.max_val}], '
+                + f'tests={self.test_number}, mean={self.mean:.3f}, '
+                + f'total_time={self.wall_time["total"]:.6f}, '
+                + f'rng_calls={self.rng_calls}, '
+                + f'comparisons={self.comparisons})')
+
+
+class AttemptsStats():
+    def __init__(self, n_bins:int=1000, bin_width:int=1):
+        """Running statistics of attempts: count, mean, variance, 
+        min, max and histogram with fixed bins. Memory does not depend on 
+        count of attempts. Statistics of different parts of tests 
+        can be merged.
+
+        Args:
+            n_bins (int): Number of histogram bins. Bin i counts attempts 
+                in [1 + i*bin_width, 1 + (i+1)*bin_width). The last bin also 
+                counts all bigger attempts. Defaults to 1000.
+            bin_width (int): Width of histogram bin. Defaults to 1.
+        """
+        self.n_bins = n_bins
+        self.bin_width = bin_width
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0 # Sum of squared deviations from the mean
+        self.min = None
+        self.max = None
+        self.histogram = np.zeros(n_bins, dtype=np.int64)
+    
+    
+    @property
+    def var(self) -> float:
+        """Return variance of attempts
+
+        Returns:
+            float: Variance of attempts
+        """
+        if self.count == 0:
+            return np.nan
+        return self._m2 / self.count
+    
+    
+    def update(self, attempts_numbers:np.ndarray, counts:np.ndarray=None):
+        """Add attempts to statistics
+
+        Args:
+            attempts_numbers (np.ndarray): Number of attempts
+            counts (np.ndarray, optional): Count of tests for each number 
+                of attempts. Defaults to None - one test for each.
+        """
+        if len(attempts_numbers) == 0:
+            return
+        if counts is None:
+            counts = np.ones(len(attempts_numbers), dtype=np.int64)
+        other = AttemptsStats(self.n_bins, self.bin_width)
+        other.count = int(np.sum(counts))
+        other.mean = float(np.sum(attempts_numbers * counts)) / other.count
+        other._m2 = float(np.sum(
+            counts * (attempts_numbers - other.mean)**2
+        ))
+        other.min = int(np.min(attempts_numbers))
+        other.max = int(np.max(attempts_numbers))
+        bins = np.minimum(
+            (attempts_numbers - 1) // self.bin_width, self.n_bins - 1
+        ).astype(np.int64)
+        other.histogram = np.bincount(
+            bins, weights=counts, minlength=self.n_bins
+        ).astype(np.int64)
+        self.merge(other)
+    
+    
+    def merge(self, other:'AttemptsStats'):
+        """Merge statistics of other attempts (Chan's parallel algorithm)
+
+        Args:
+            other (AttemptsStats): Statistics with the same bins
+
+        Raises:
+            ValueError: If histogram bins are different
+        """
+        if (other.n_bins, other.bin_width) != (self.n_bins, self.bin_width):
+            raise ValueError('Histogram bins must be the same')
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.min, self.max = other.min, other.max
+        else:
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self._m2 += other._m2 + delta**2 * self.count * other.count / count
+        self.count = count
+        self.histogram += other.histogram
+
+
+# Maximum number of bins of the full attempts histogram
+max_hist_bins = 10**6
+
+def get_attempts_stats(attempts_numbers:np.ndarray, \
+    counts:np.ndarray=None) -> AttemptsStats:
+    """Get statistics of attempts with full histogram: one bin for each 
+    number of attempts up to max_hist_bins bins
+
+    Args:
+        attempts_numbers (np.ndarray): Number of attempts
+        counts (np.ndarray, optional): Count of tests for each number 
+            of attempts. Defaults to None - one test for each.
+
+    Returns:
+        AttemptsStats: Statistics of attempts
+    """
+    max_attempts = int(np.max(attempts_numbers))
+    bin_width = -(-max_attempts // max_hist_bins) # Ceil division
+    attempts_stats = AttemptsStats(-(-max_attempts // bin_width), bin_width)
+    attempts_stats.update(attempts_numbers, counts)
+    return attempts_stats
+
+
+def stream_attempts(test_kernel:callable, test_number:int=1000, \
+    guess_number:int=None, min_val:int=1, max_val:int=100, \
+    chunk_size:int=2**20, use_batch:bool=True, use_sampling:bool=False, \
+    n_bins:int=1000, bin_width:int=1, counters:dict=None) -> AttemptsStats:
+    """Get statistics of attempts in test_number tests. Guess numbers 
+    are generated and tested by chunks, so memory is bounded 
+    by chunk_size.
+    
+    Guess numbers are drawn by separate generator with seed 1, so they are 
+    the same as in score_game. Numpy global generator used by kernel is 
+    seeded by 1 and skips guess numbers chunk by chunk, so it has 
+    the same state as in score_game too.
+
+    Args:
+        test_kernel (callable): Tested guess function
+        test_number (int): Number of necessary tests. Defaults to 1000.
+        guess_number (int, optional): Number for guessing. 
+            Defaults to None.
+        min_val (int, optional): Minimum value of guess number. 
+            Defaults to 1.
+        max_val (int, optional): Maximum value of guess number. 
+            Defaults to 100.
+        chunk_size (int): Count of tests in chunk. Defaults to 2**20.
+        use_batch (bool or str): Use batched version of the kernel 
+            (see get_batch_kernel). Defaults to True.
+        use_sampling (bool): Use sampling version of the kernel. 
+            Defaults to False.
+        n_bins (int): Number of histogram bins. Defaults to 1000.
+        bin_width (int): Width of histogram bin. Defaults to 1.
+        counters (dict, optional): Instrumentation counters (see 
+            get_attempts). Generation time of guess numbers is added 
+            to "numbers_time". Defaults to None - no instrumentation.
+
+    Returns:
+        AttemptsStats: Statistics of attempts. 
+            None, if some kernel result is incorrect
+    """
+    
+    number_rng = np.random.RandomState(1) # Generator of guess numbers
+    np.random.seed(1) # Fix seed for repeatability
+    if guess_number is None:
+        # Skip guess numbers in global generator
+        for start in range(0, test_number, chunk_size):
+            random_numbers(min_val, max_val, \
+                min(chunk_size, test_number - start))
+    attempts_stats = AttemptsStats(n_bins, bin_width)
+    
+    for start in range(0, test_number, chunk_size):
+        if counters is not None:
+            start_time = time.perf_counter()
+        size = min(chunk_size, test_number - start)
+        if guess_number is None:
+            number_array = random_numbers(min_val, max_val, size, number_rng)
+        else:
+            number_array = np.full(size, guess_number)
+        if counters is not None:
+            add_counter(counters, 'numbers_time', \
+                time.perf_counter() - start_time)
+        attempts_numbers = get_attempts(test_kernel, number_array, \
+            min_val, max_val, use_batch=use_batch, \
+            use_sampling=use_sampling, counters=counters)
+        if attempts_numbers is None:
+            return
+        attempts_stats.update(attempts_numbers)
+    return attempts_stats
+
+
+# RANDOM NUMBERS
+# Ranges, which fit int64, are drawn by numpy directly (fast path). 
+# Wider ranges are drawn as python integers composed of 32-bit words 
+# of the same numpy generator, so any range width is allowed
+
+int64_min = int(np.iinfo(np.int64).min)
+int64_max = int(np.iinfo(np.int64).max)
+
+def fits_int64(min_val:int, max_val:int) -> bool:
+    """Check, that numbers of range and max_val+1 fit int64
+
+    Args:
+        min_val (int): Minimum value of range
+        max_val (int): Maximum value of range
+
+    Returns:
+        bool: True, if int64 can be used
+    """
+    return int64_min <= min_val and max_val < int64_max
+
+
+def random_below(spans:np.ndarray, rng=np.random) -> np.ndarray:
+    """Draw uniform python integers in [0, span) for each span 
+    by rejection sampling of 32-bit words
+
+    Args:
+        spans (np.ndarray): Positive python integers (object array)
+        rng (optional): Numpy generator with "randint" method. 
+            Defaults to np.random.
+
+    Returns:
+        np.ndarray: Random integers (object array)
+    """
+    spans = np.asarray(spans, dtype=object)
+    bits = np.array([(int(span)-1).bit_length() for span in spans])
+    masks = np.array([(1 << int(bit)) - 1 for bit in bits], dtype=object)
+    n_words = max(1, -(-int(bits.max(initial=0)) // 32))
+    
+    numbers = np.zeros(len(spans), dtype=object)
+    pending = np.arange(len(spans)) # Indexes of rejected numbers
+    while len(pending):
+        words = rng.randint(0, 2**32, size=(len(pending), n_words), \
+            dtype=np.uint64)
+        current_numbers = np.zeros(len(pending), dtype=object)
+        for i in range(n_words):
+            current_numbers += words[:, i].astype(object) << (32*i)
+        current_numbers &= masks[pending]
+        accept_mask = current_numbers < spans[pending]
+        numbers[pending[accept_mask]] = current_numbers[accept_mask]
+        pending = pending[~accept_mask]
+    return numbers
+
+
+def random_numbers(min_val:int, max_val:int, size:int, \
+    rng=np.random) -> np.ndarray:
+    """Draw uniform integers in [min_val, max_val]
+
+    Args:
+        min_val (int): Minimum value
+        max_val (int): Maximum value
+        size (int): Count of numbers
+        rng (optional): Numpy generator with "randint" method. 
+            Defaults to np.random.
+
+    Returns:
+        np.ndarray: Random integers. Object array of python integers, 
+            if range does not fit int64
+    """
+    if fits_int64(min_val, max_val):
+        return rng.randint(min_val, max_val+1, size=size)
+    return min_val + random_below(np.full(size, max_val-min_val+1, \
+        dtype=object), rng)
+
+
+def random_numbers_between(min_vals:np.ndarray, max_vals:np.ndarray, \
+    rng=np.random) -> np.ndarray:
+    """Draw uniform integer in [min_vals[i], max_vals[i]] for each i
+
+    Args:
+        min_vals (np.ndarray): Minimum values
+        max_vals (np.ndarray): Maximum values
+        rng (optional): Numpy generator with "randint" method. 
+            Defaults to np.random.
+
+    Returns:
+        np.ndarray: Random integers with dtype of min_vals
+    """
+    if min_vals.dtype != object:
+        return rng.randint(min_vals, max_vals+1)
+    return min_vals + random_below(max_vals - min_vals + 1, rng)
+
+
+def random_number(min_val:int, max_val:int) -> int:
+    """Draw uniform integer in [min_val, max_val] by numpy global generator
+
+    Args:
+        min_val (int): Minimum value
+        max_val (int): Maximum value
+
+    Returns:
+        int: Random integer
+    """
+    if fits_int64(min_val, max_val):
+        return np.random.randint(min_val, max_val+1)
+    return min_val + random_below(np.array([max_val-min_val+1], \
+        dtype=object))[0]
+
+
+def get_numbers_dtype(min_val:int, max_val:int):
+    """Get dtype of numbers arrays for range
+
+    Args:
+        min_val (int): Minimum value of range
+        max_val (int): Maximum value of range
+
+    Returns:
+        dtype: np.int64 or object for python integers
+    """
+    return np.int64 if fits_int64(min_val, max_val) else object
+
+
 def random_predict(guess_number:int=1, min_val:int=1, max_val:int=100) -> int:
     """Random predicting the number
 
@@ -126,7 +676,7 @@ def random_predict(guess_number:int=1, min_val:int=1, max_val:int=100) -> int:
         
     while True:
         count += 1
-        predict_number = np.random.randint(min_val, max_val+1)
+        predict_number = random_number(min_val, max_val)
         if predict_number == guess_number:
             break # Exit, if we guess
     return(count)
@@ -159,7 +709,7 @@ def random_predict_range_dividing(guess_number:int=1, min_val:int=1, \
         
     while True:
         count += 1
-        predict_number = np.random.randint(min_val, max_val+1)
+        predict_number = random_number(min_val, max_val)
         if predict_number > guess_number:
             max_val = predict_number
         elif predict_number < guess_number:
@@ -206,6 +756,554 @@ def predict_division_two(guess_number:int=1, min_val:int=1, \
     return(count)
 
 
+def check_guess_numbers(guess_numbers:np.ndarray, min_val:int=1, \
+    max_val:int=100) -> bool:
+    """Check, that all guess numbers in guess range
+
+    Args:
+        guess_numbers (np.ndarray): Guess numbers
+        min_val (int, optional): Minimum value of guess number. Defaults to 1.
+        max_val (int, optional): Maximum value of guess number. 
+            Defaults to 100.
+
+    Returns:
+        bool: True, if all numbers in range
+    """
+    
+    try:
+        if len(guess_numbers) and not(min_val <= guess_numbers.min() \
+            and guess_numbers.max() <= max_val):
+            raise ValueError("Guess number out of range")
+    except ValueError as e:
+        print(e)
+        return False
+    return True
+
+
+# BATCHED KERNELS
+# Batched kernel gets the whole array of guess numbers and returns 
+# array of attempts. It is attached to the scalar kernel as 
+# "batch_kernel" attribute, which is used by score_game, if it gives 
+# the same attempts as the scalar kernel for the same seed. 
+# Otherwise it is attached as "lockstep_kernel" attribute (see 
+# get_batch_kernel)
+
+# Maximum size of the random numbers block
+max_block_size = 2**20
+
+def random_predict_batch(guess_numbers:np.ndarray, min_val:int=1, \
+    max_val:int=100, \
+    counters:dict=None) -> np.ndarray:
+    """Batched version of random_predict.
+    
+    Guesses of all games are drawn by blocks and games are replayed in 
+    the same order, as random_predict is called one by one. Thus 
+    attempts are the same as for random_predict with the same seed.
+
+    Args:
+        guess_numbers (np.ndarray): Guess numbers
+        min_val (int, optional): Minimum value of guess number. Defaults to 1.
+        max_val (int, optional): Maximum value of guess number. 
+            Defaults to 100.
+        counters (dict, optional): Instrumentation counters. 
+            Defaults to None.
+
+    Returns:
+        np.ndarray: Number of attempts for each guess number
+    """
+    
+    # Check, that range fits int64
+    try:
+        if not fits_int64(min_val, max_val):
+            raise ValueError("Range is too wide for random_predict. "
+                             + "Use sampling")
+    except ValueError as e:
+        print(e)
+        return
+    
+    guess_numbers = np.asarray(guess_numbers, dtype=np.int64)
+    if not check_guess_numbers(guess_numbers, min_val, max_val):
+        return
+    
+    count = np.zeros(len(guess_numbers), dtype=np.int64)
+    # Keep generator state for rewinding after drawing extra numbers
+    state = np.random.get_state()
+    block_size = int(min(max_block_size, 64*(max_val-min_val+1)))
+    pos = block_size # Position in the current block
+    
+    for i, number in enumerate(guess_numbers):
+        while True:
+            if pos == block_size:
+                # Draw new block and group positions by predict number
+                block = np.random.randint(min_val, max_val+1, \
+                    size=block_size)
+                order = np.argsort(block, kind='stable')
+                sorted_block = block[order]
+                pos = 0
+            # Positions of the guess number in the block
+            left = np.searchsorted(sorted_block, number, side='left')
+            right = np.searchsorted(sorted_block, number, side='right')
+            positions = order[left:right]
+            hit = np.searchsorted(positions, pos)
+            if hit < len(positions):
+                count[i] += positions[hit] - pos + 1
+                pos = positions[hit] + 1
+                break # Exit, if we guess
+            count[i] += block_size - pos
+            pos = block_size
+    
+    # Rewind generator to the state after the last guess
+    np.random.set_state(state)
+    total = int(count.sum())
+    if counters is not None:
+        add_counter(counters, 'rng_calls', total)
+        add_counter(counters, 'comparisons', total)
+    while total > 0:
+        np.random.randint(min_val, max_val+1, size=min(total, block_size))
+        total -= block_size
+    return count
+
+
+def random_predict_range_dividing_batch(guess_numbers:np.ndarray, \
+    min_val:int=1, max_val:int=100, \
+    counters:dict=None) -> np.ndarray:
+    """Batched version of random_predict_range_dividing. 
+    All games are played in lockstep: one predict for each unsolved game 
+    per step. 
+    
+    Number of attempts has the same distribution as for 
+    random_predict_range_dividing, but random numbers are taken 
+    in the other order. So it is used by score_game only with 
+    use_batch='lockstep'.
+
+    Args:
+        guess_numbers (np.ndarray): Guess numbers
+        min_val (int, optional): Minimum value of guess number. Defaults to 1.
+        max_val (int, optional): Maximum value of guess number. 
+            Defaults to 100.
+        counters (dict, optional): Instrumentation counters. 
+            Defaults to None.
+
+    Returns:
+        np.ndarray: Number of attempts for each guess number
+    """
+    
+    dtype = get_numbers_dtype(min_val, max_val)
+    guess_numbers = np.asarray(guess_numbers, dtype=dtype)
+    if not check_guess_numbers(guess_numbers, min_val, max_val):
+        return
+    
+    count = np.zeros(len(guess_numbers), dtype=np.int64)
+    min_vals = np.full(len(guess_numbers), min_val, dtype=dtype)
+    max_vals = np.full(len(guess_numbers), max_val, dtype=dtype)
+    active = np.arange(len(guess_numbers)) # Indexes of unsolved games
+    
+    while len(active):
+        count[active] += 1
+        predict_numbers = random_numbers_between(min_vals[active], \
+            max_vals[active])
+        current_numbers = guess_numbers[active]
+        more_mask = predict_numbers > current_numbers
+        less_mask = predict_numbers < current_numbers
+        max_vals[active[more_mask]] = predict_numbers[more_mask]
+        min_vals[active[less_mask]] = predict_numbers[less_mask]
+        active = active[more_mask | less_mask] # Exit, if we guess
+    if counters is not None:
+        add_counter(counters, 'rng_calls', int(count.sum()))
+        add_counter(counters, 'comparisons', int(count.sum()))
+    return count
+
+
+def get_midpoints(min_vals:np.ndarray, max_vals:np.ndarray) -> np.ndarray:
+    """Get (min_vals + max_vals) // 2 without overflow of int64: 
+    halves are summed and the lost unit is added, if both are odd
+
+    Args:
+        min_vals (np.ndarray): Minimum values
+        max_vals (np.ndarray): Maximum values
+
+    Returns:
+        np.ndarray: Midpoints rounded down
+    """
+    return (min_vals >> 1) + (max_vals >> 1) + (min_vals & max_vals & 1)
+
+
+def predict_division_two_batch(guess_numbers:np.ndarray, min_val:int=1, \
+    max_val:int=100, \
+    counters:dict=None) -> np.ndarray:
+    """Batched version of predict_division_two. 
+    All games are played in lockstep: one predict for each unsolved game 
+    per step.
+
+    Args:
+        guess_numbers (np.ndarray): Guess numbers
+        min_val (int, optional): Minimum value of guess number. Defaults to 1.
+        max_val (int, optional): Maximum value of guess number. 
+            Defaults to 100.
+        counters (dict, optional): Instrumentation counters. 
+            Defaults to None.
+
+    Returns:
+        np.ndarray: Number of attempts for each guess number
+    """
+    
+    dtype = get_numbers_dtype(min_val, max_val)
+    guess_numbers = np.asarray(guess_numbers, dtype=dtype)
+    if not check_guess_numbers(guess_numbers, min_val, max_val):
+        return
+    
+    count = np.zeros(len(guess_numbers), dtype=np.int64)
+    min_vals = np.full(len(guess_numbers), min_val, dtype=dtype)
+    max_vals = np.full(len(guess_numbers), max_val, dtype=dtype)
+    active = np.arange(len(guess_numbers)) # Indexes of unsolved games
+    
+    while len(active):
+        count[active] += 1
+        predict_numbers = get_midpoints(min_vals[active], max_vals[active])
+        current_numbers = guess_numbers[active]
+        more_mask = predict_numbers > current_numbers
+        less_mask = predict_numbers < current_numbers
+        max_vals[active[more_mask]] = predict_numbers[more_mask] - 1
+        min_vals[active[less_mask]] = predict_numbers[less_mask] + 1
+        active = active[more_mask | less_mask] # Exit, if we guess
+    if counters is not None:
+        add_counter(counters, 'rng_calls', 0)
+        add_counter(counters, 'comparisons', int(count.sum()))
+    return count
+
+
+# SAMPLING KERNELS
+# Sampling kernel draws number of attempts from the known distribution 
+# of the kernel instead of playing games. It is attached to the scalar 
+# kernel as "sample_kernel" attribute, which is used by score_game
+
+# Maximum range size to draw geometric distribution by numpy in int64
+max_geometric_span = 2**53
+
+def random_predict_sample(guess_numbers:np.ndarray, min_val:int=1, \
+    max_val:int=100, \
+    counters:dict=None) -> np.ndarray:
+    """Sampling version of random_predict.
+    
+    Each predict of random_predict is right with probability 
+    1/(max_val-min_val+1) independently of the guess number, so number of 
+    attempts has geometric distribution. All attempts are drawn 
+    by one call.
+
+    Args:
+        guess_numbers (np.ndarray): Guess numbers
+        min_val (int, optional): Minimum value of guess number. Defaults to 1.
+        max_val (int, optional): Maximum value of guess number. 
+            Defaults to 100.
+        counters (dict, optional): Instrumentation counters. 
+            Defaults to None.
+
+    Returns:
+        np.ndarray: Number of attempts for each guess number
+    """
+    
+    guess_numbers = np.asarray(guess_numbers, \
+        dtype=get_numbers_dtype(min_val, max_val))
+    if not check_guess_numbers(guess_numbers, min_val, max_val):
+        return
+    
+    if counters is not None:
+        # Games are not played: one draw for each game
+        add_counter(counters, 'rng_calls', len(guess_numbers))
+        add_counter(counters, 'comparisons', 0)
+    
+    if max_val - min_val + 1 <= max_geometric_span:
+        return np.random.geometric(1 / (max_val-min_val+1), \
+            size=len(guess_numbers)).astype(np.int64)
+    
+    # Attempts may not fit int64: inverse transform in float
+    probability = 1 / (max_val-min_val+1)
+    attempts_numbers = np.floor(
+        np.log1p(-np.random.random_sample(len(guess_numbers))) 
+        / np.log1p(-probability)
+    ) + 1
+    return np.array([int(attempts) for attempts in attempts_numbers], \
+        dtype=object)
+
+
+random_predict.sample_kernel = random_predict_sample
+random_predict.batch_kernel = random_predict_batch
+random_predict_range_dividing.lockstep_kernel = \
+    random_predict_range_dividing_batch
+predict_division_two.batch_kernel = predict_division_two_batch
+
+
+# EXACT EVALUATION
+# Deterministic kernel has the same number of attempts for the number 
+# in each game. Its attempts can be calculated for all numbers in range 
+# once. Kernel gets "attempts_distribution" attribute for it 
+# and optionally "attempts_table"
+
+# Maximum range size to keep the full attempts table
+max_table_size = 10**7
+# Number of ranges kept by get_exact_attempts
+exact_cache_size = 32
+
+def division_two_attempts_table(min_val:int=1, max_val:int=100) \
+    -> np.ndarray:
+    """Get number of attempts of predict_division_two for each number 
+    in range. Bisection tree is built level by level, so time is O(range)
+
+    Args:
+        min_val (int, optional): Minimum value of guess number. Defaults to 1.
+        max_val (int, optional): Maximum value of guess number. 
+            Defaults to 100.
+
+    Returns:
+        np.ndarray: Number of attempts, where index is (number - min_val)
+    """
+    
+    table = np.zeros(max_val-min_val+1, dtype=np.uint8)
+    # Subranges of the current tree level (shifted by min_val)
+    min_vals = np.array([0], dtype=np.int64)
+    max_vals = np.array([max_val-min_val], dtype=np.int64)
+    count = 1
+    
+    while len(min_vals):
+        predict_numbers = (min_vals + max_vals) // 2
+        table[predict_numbers] = count
+        # Left and right subranges
+        min_vals = np.concatenate([min_vals, predict_numbers + 1])
+        max_vals = np.concatenate([predict_numbers - 1, max_vals])
+        nonempty_mask = min_vals <= max_vals
+        min_vals = min_vals[nonempty_mask]
+        max_vals = max_vals[nonempty_mask]
+        count += 1
+    return table
+
+
+def division_two_distribution(min_val:int=1, max_val:int=100) -> dict:
+    """Get distribution of attempts of predict_division_two over all 
+    numbers in range. 
+    
+    Subtree of the bisection tree depends only on the range length. Each 
+    tree level has at most two lengths, so time is O(log(range)^2) 
+    and any big range is allowed.
+
+    Args:
+        min_val (int, optional): Minimum value of guess number. Defaults to 1.
+        max_val (int, optional): Maximum value of guess number. 
+            Defaults to 100.
+
+    Returns:
+        dict: Number of attempts - count of numbers
+    """
+    
+    distribution = {}
+    lengths = {max_val-min_val+1: 1} # Range length - count of ranges
+    count = 1
+    
+    while lengths:
+        distribution[count] = sum(lengths.values())
+        sublengths = {}
+        for length, length_count in lengths.items():
+            left_length = (length-1) // 2
+            for sublength in (left_length, length-1-left_length):
+                if sublength > 0:
+                    sublengths[sublength] = sublengths.get(sublength, 0) \
+                        + length_count
+        lengths = sublengths
+        count += 1
+    return distribution
+
+
+@lru_cache(maxsize=exact_cache_size)
+def get_exact_attempts(test_kernel:callable, min_val:int=1, \
+    max_val:int=100) -> dict:
+    """Get exact attempts statistics of the deterministic kernel 
+    over all numbers in range. Results are cached for the last 
+    exact_cache_size (kernel, min_val, max_val)
+
+    Args:
+        test_kernel (callable): Deterministic guess function with 
+            "attempts_distribution" attribute
+        min_val (int, optional): Minimum value of guess number. Defaults to 1.
+        max_val (int, optional): Maximum value of guess number. 
+            Defaults to 100.
+
+    Returns:
+        dict: 'mean' - mean number of attempts, 
+            'max' - maximum number of attempts, 
+            'distribution' - dict of number of attempts - count of numbers, 
+            'table' - attempts for each number (number - min_val) or None, 
+            if the range is bigger than max_table_size
+    """
+    
+    # Check the range
+    try:
+        if min_val > max_val:
+            raise ValueError("Minimum value more than maximum value")
+    except ValueError as e:
+        print(e)
+        return
+    
+    distribution = test_kernel.attempts_distribution(min_val, max_val)
+    total_attempts = sum(attempts * count 
+                         for attempts, count in distribution.items())
+    
+    table = None
+    if hasattr(test_kernel, 'attempts_table') \
+        and max_val - min_val + 1 <= max_table_size:
+        table = test_kernel.attempts_table(min_val, max_val)
+    
+    return {
+        'mean': total_attempts / (max_val-min_val+1),
+        'max': max(distribution),
+        'distribution': distribution,
+        'table': table,
+    }
+
+
+predict_division_two.attempts_distribution = division_two_distribution
+predict_division_two.attempts_table = division_two_attempts_table
+
+
+# TOURNAMENT
+def play_tournament_chunk(test_kernel:callable, min_val:int, max_val:int, \
+    test_number:int, seed_seq:np.random.SeedSequence, use_batch:bool=True, \
+    use_sampling:bool=False, n_bins:int=1000, \
+    bin_width:int=1) -> AttemptsStats:
+    """Play one chunk of tournament games. Numpy global generator 
+    is seeded by seed_seq, so result does not depend on the process 
+    where chunk is played.
+
+    Args:
+        test_kernel (callable): Tested guess function
+        min_val (int): Minimum value of guess number
+        max_val (int): Maximum value of guess number
+        test_number (int): Number of tests in chunk
+        seed_seq (np.random.SeedSequence): Seed of the chunk
+        use_batch (bool or str): Use batched version of the kernel 
+            (see get_batch_kernel). Defaults to True.
+        use_sampling (bool): Use sampling version of the kernel. 
+            Defaults to False.
+        n_bins (int): Number of histogram bins. Defaults to 1000.
+        bin_width (int): Width of histogram bin. Defaults to 1.
+
+    Returns:
+        AttemptsStats: Statistics of attempts in chunk. 
+            None, if some kernel result is incorrect
+    """
+    np.random.seed(seed_seq.generate_state(4))
+    number_array = random_numbers(min_val, max_val, test_number)
+    attempts_numbers = get_attempts(test_kernel, number_array, min_val, \
+        max_val, use_batch=use_batch, use_sampling=use_sampling)
+    if attempts_numbers is None:
+        return
+    attempts_stats = AttemptsStats(n_bins, bin_width)
+    attempts_stats.update(attempts_numbers)
+    return attempts_stats
+
+
+def run_tournament(kernels:list=None, ranges:list=[(1, 100)], \
+    test_number:int=1000, chunk_size:int=2**20, n_workers:int=None, \
+    seed:int=1, use_batch:bool=True, use_sampling:bool=False, \
+    verbose:bool=True) -> list:
+    """Compare game kernels on each range. Tests are split into 
+    (kernel, range, chunk) jobs, which are played on the process pool. 
+    Each job gets its own seed by SeedSequence.spawn, so result does not 
+    depend on the number of workers.
+
+    Args:
+        kernels (list, optional): Tested guess functions. They must be 
+            importable by the worker processes. Defaults to None - 
+            random_predict, random_predict_range_dividing and 
+            predict_division_two.
+        ranges (list): List of (min_val, max_val). Defaults to [(1, 100)].
+        test_number (int): Number of tests for each kernel and range. 
+            Defaults to 1000.
+        chunk_size (int): Number of tests in one job. Defaults to 2**20.
+        n_workers (int, optional): Number of processes. If 1, jobs are 
+            played in the current process. Defaults to None - number 
+            of CPUs.
+        seed (int): Seed of the tournament. Defaults to 1.
+        use_batch (bool or str): Use batched version of the kernel 
+            (see get_batch_kernel). Defaults to True.
+        use_sampling (bool): Use sampling version of the kernel. 
+            Defaults to False.
+        verbose (bool): Print the comparison table. Defaults to True.
+
+    Returns:
+        list: Comparison table - list of dicts with kernel name, range 
+            and attempts statistics, sorted by range and mean attempts
+    """
+    if kernels is None:
+        kernels = [random_predict, random_predict_range_dividing, 
+                   predict_division_two]
+    
+    # Prepare jobs and their seeds
+    jobs = []
+    for test_kernel in kernels:
+        for min_val, max_val in ranges:
+            for start in range(0, test_number, chunk_size):
+                jobs.append((test_kernel, min_val, max_val, 
+                             min(chunk_size, test_number - start)))
+    seeds = np.random.SeedSequence(seed).spawn(len(jobs))
+    job_args = [
+        (*job, seed_seq, use_batch, use_sampling) 
+            for job, seed_seq in zip(jobs, seeds)
+    ]
+    
+    if n_workers == 1:
+        results = [play_tournament_chunk(*args) for args in job_args]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            futures = [executor.submit(play_tournament_chunk, *args) 
+                       for args in job_args]
+            results = [future.result() for future in futures]
+    
+    # Merge chunks statistics in the jobs order
+    stats = {}
+    for (test_kernel, min_val, max_val, _), chunk_stats in \
+        zip(jobs, results):
+        key = (test_kernel, min_val, max_val)
+        if chunk_stats is None or stats.get(key, True) is None:
+            stats[key] = None # Incorrect kernel result
+            continue
+        stats.setdefault(key, AttemptsStats()).merge(chunk_stats)
+    
+    table = []
+    for (test_kernel, min_val, max_val), attempts_stats in stats.items():
+        if attempts_stats is None:
+            continue
+        table.append({
+            'kernel': test_kernel.__name__,
+            'min_val': min_val,
+            'max_val': max_val,
+            'test_number': attempts_stats.count,
+            'mean': attempts_stats.mean,
+            'std': attempts_stats.var**0.5,
+            'min': attempts_stats.min,
+            'max': attempts_stats.max,
+        })
+    table.sort(key=lambda row: (row['min_val'], row['max_val'], row['mean']))
+    
+    if verbose:
+        print_tournament_table(table)
+    return table
+
+
+def print_tournament_table(table:list):
+    """Print comparison table of the tournament
+
+    Args:
+        table (list): Result of run_tournament
+    """
+    name_width = max([len('kernel')] + [len(row['kernel']) for row in table])
+    print(f'{"kernel":<{name_width}} {"range":>28} {"tests":>10} '
+          + f'{"mean":>12} {"std":>12} {"min":>8} {"max":>12}')
+    for row in table:
+        range_str = f'[{row["min_val"]}, {row["max_val"]}]'
+        print(f'{row["kernel"]:<{name_width}} {range_str:>28} '
+              + f'{row["test_number"]:>10} {row["mean"]:>12.3f} '
+              + f'{row["std"]:>12.3f} {row["min"]:>8} {row["max"]:>12}')
+
+
 if __name__ == '__main__':
     print('random_predict:', random_predict())
     print('random_predict_range_dividing:', random_predict_range_dividing())
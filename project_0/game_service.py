@@ -0,0 +1,621 @@
+"""
+Asyncio service for game 'Guess number'.
+
+Server keeps many game sessions. Each session has a hidden number and
+answers more/less feedback for guesses by the same rules as the kernels
+in game_kernel.py. Guesses for many sessions are sent in one request,
+so bisection of all sessions takes one round trip per step.
+
+Protocol (one line per request and per reply):
+    NEW <count>                      -> OK <id>,<id>,...
+    GUESS <id>,<id>,... <g>,<g>,...  -> OK <feedback of each guess>
+        feedback: '>' - hidden number is more than guess,
+                  '<' - hidden number is less than guess,
+                  '=' - number is guessed
+    ATTEMPTS <id>,<id>,...           -> OK <attempts>,<attempts>,...
+    CLOSE <id>,<id>,...              -> OK
+Errors are replied as: ERR <message>
+
+Usage:
+    python game_service.py --serve --port 8888
+    python game_service.py --clients 8 --sessions 10000
+"""
+
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+# Feedback symbols by sign of (hidden number - guess)
+feedback_symbols = np.array(['<', '=', '>'])
+# Default maximum number of opened sessions
+max_sessions_default = 2**24
+
+class SessionStore():
+    def __init__(
+        self,
+        min_val:int=1,
+        max_val:int=100,
+        capacity:int=1024,
+        seed:int=None,
+        max_sessions:int=max_sessions_default,
+    ):
+        """Compact storage of game sessions. Sessions are kept in numpy
+        arrays, session id is an index in these arrays. Ids of closed
+        sessions are reused.
+
+        Args:
+            min_val (int, optional): Minimum value of hidden number.
+                Defaults to 1.
+            max_val (int, optional): Maximum value of hidden number.
+                Defaults to 100.
+            capacity (int, optional): Initial number of sessions. Storage
+                grows twice if it is full. Defaults to 1024.
+            seed (int, optional): Seed of hidden numbers generator.
+                Defaults to None.
+            max_sessions (int, optional): Maximum number of opened
+                sessions. Defaults to 2**24.
+        """
+        self.min_val = min_val
+        self.max_val = max_val
+        self.max_sessions = max_sessions
+        self._rng = np.random.default_rng(seed)
+        self.hidden = np.zeros(capacity, dtype=np.int64)
+        self.attempts = np.zeros(capacity, dtype=np.int64)
+        self.opened = np.zeros(capacity, dtype=bool)
+        # Stack of free ids
+        self._free = np.arange(capacity-1, -1, -1)
+        self._free_cnt = capacity
+
+
+    @property
+    def capacity(self) -> int:
+        return len(self.hidden)
+
+
+    def _grow(self, min_capacity:int):
+        """Increase capacity of the storage at least to min_capacity
+
+        Args:
+            min_capacity (int): Required capacity
+        """
+        capacity = self.capacity
+        new_capacity = max(min(2*capacity, self.max_sessions), min_capacity)
+        self.hidden = np.resize(self.hidden, new_capacity)
+        self.attempts = np.resize(self.attempts, new_capacity)
+        self.opened = np.concatenate(
+            [self.opened, np.zeros(new_capacity-capacity, dtype=bool)]
+        )
+        # New ids are put under the current free ids
+        free = np.empty(new_capacity, dtype=np.int64)
+        free[:new_capacity-capacity] = np.arange(
+            new_capacity-1, capacity-1, -1
+        )
+        free[new_capacity-capacity:new_capacity-capacity+self._free_cnt] = \
+            self._free[:self._free_cnt]
+        self._free = free
+        self._free_cnt += new_capacity - capacity
+
+
+    def create(self, count:int) -> np.ndarray:
+        """Open new sessions with random hidden numbers
+
+        Args:
+            count (int): Number of sessions
+
+        Raises:
+            ValueError: If count is less than one or number of opened
+                sessions would be more than max_sessions
+
+        Returns:
+            np.ndarray: Ids of new sessions
+        """
+        if count < 1:
+            raise ValueError('Count of sessions must be more than zero')
+        if count > self.max_sessions - (self.capacity - self._free_cnt):
+            raise ValueError(
+                f'Too many sessions. Maximum is {self.max_sessions}'
+            )
+        if count > self._free_cnt:
+            self._grow(self.capacity - self._free_cnt + count)
+        ids = self._free[self._free_cnt-count:self._free_cnt][::-1].copy()
+        self._free_cnt -= count
+        self.hidden[ids] = self._rng.integers(
+            self.min_val, self.max_val, size=count, endpoint=True
+        )
+        self.attempts[ids] = 0
+        self.opened[ids] = True
+        return ids
+
+
+    def _check_ids(self, ids:np.ndarray):
+        """Check, that all sessions are opened
+
+        Args:
+            ids (np.ndarray): Session ids
+
+        Raises:
+            ValueError: If some session does not exist
+        """
+        if len(ids) and (ids.min() < 0 or ids.max() >= self.capacity \
+            or not self.opened[ids].all()):
+            raise ValueError('Unknown session id')
+
+
+    def guess(self, ids:np.ndarray, predict_numbers:np.ndarray) \
+        -> np.ndarray:
+        """Check guesses of the sessions
+
+        Args:
+            ids (np.ndarray): Session ids
+            predict_numbers (np.ndarray): Guess for each session
+
+        Raises:
+            ValueError: If sizes are different or some session
+                does not exist
+
+        Returns:
+            np.ndarray: Sign of (hidden number - guess) for each guess
+        """
+        if len(ids) != len(predict_numbers):
+            raise ValueError('Number of ids and guesses must be the same')
+        self._check_ids(ids)
+        np.add.at(self.attempts, ids, 1)
+        # Numbers are compared without subtraction to avoid overflow
+        hidden = self.hidden[ids]
+        return (hidden > predict_numbers).astype(np.int64) \
+            - (hidden < predict_numbers)
+
+
+    def get_attempts(self, ids:np.ndarray) -> np.ndarray:
+        """Get number of attempts of the sessions
+
+        Args:
+            ids (np.ndarray): Session ids
+
+        Returns:
+            np.ndarray: Number of attempts
+        """
+        self._check_ids(ids)
+        return self.attempts[ids]
+
+
+    def close(self, ids:np.ndarray):
+        """Close sessions and free their ids
+
+        Args:
+            ids (np.ndarray): Session ids
+        """
+        ids = np.unique(ids)
+        self._check_ids(ids)
+        self.opened[ids] = False
+        self._free[self._free_cnt:self._free_cnt+len(ids)] = ids
+        self._free_cnt += len(ids)
+
+
+
+def parse_numbers(text:str) -> np.ndarray:
+    """Parse comma-separated integers
+
+    Args:
+        text (str): Comma-separated integers
+
+    Returns:
+        np.ndarray: Integers
+
+    Raises:
+        ValueError: Text is not integers or integer does not fit int64
+    """
+    try:
+        return np.array(text.split(','), dtype=np.int64)
+    except OverflowError:
+        raise ValueError('Number out of int64 range')
+
+
+def format_numbers(numbers:np.ndarray) -> str:
+    """Format integers as comma-separated string
+
+    Args:
+        numbers (np.ndarray): Integers
+
+    Returns:
+        str: Comma-separated integers
+    """
+    return ','.join(map(str, numbers.tolist()))
+
+
+
+class GameServer():
+    def __init__(
+        self,
+        min_val:int=1,
+        max_val:int=100,
+        capacity:int=1024,
+        seed:int=None,
+        max_sessions:int=max_sessions_default,
+    ):
+        """Asyncio server of game 'Guess number' (see protocol in
+        the module description)
+
+        Args:
+            min_val (int, optional): Minimum value of hidden number.
+                Defaults to 1.
+            max_val (int, optional): Maximum value of hidden number.
+                Defaults to 100.
+            capacity (int, optional): Initial number of sessions.
+                Defaults to 1024.
+            seed (int, optional): Seed of hidden numbers generator.
+                Defaults to None.
+            max_sessions (int, optional): Maximum number of opened
+                sessions. Defaults to 2**24.
+        """
+        self.store = SessionStore(min_val, max_val, capacity, seed,
+                                  max_sessions)
+        self.server = None
+
+
+    def process(self, line:str) -> str:
+        """Process one request
+
+        Args:
+            line (str): Request line
+
+        Returns:
+            str: Reply line
+        """
+        try:
+            command, *args = line.split()
+            if command == 'NEW':
+                ids = self.store.create(int(args[0]))
+                return 'OK ' + format_numbers(ids)
+            if command == 'GUESS':
+                signs = self.store.guess(
+                    parse_numbers(args[0]), parse_numbers(args[1])
+                )
+                return 'OK ' + ''.join(feedback_symbols[signs+1])
+            if command == 'ATTEMPTS':
+                attempts = self.store.get_attempts(parse_numbers(args[0]))
+                return 'OK ' + format_numbers(attempts)
+            if command == 'CLOSE':
+                self.store.close(parse_numbers(args[0]))
+                return 'OK'
+            raise ValueError(f'Unknown command {command}')
+        except (ValueError, IndexError, OverflowError) as e:
+            return f'ERR {e}'
+
+
+    async def handle(
+        self,
+        reader:asyncio.StreamReader,
+        writer:asyncio.StreamWriter,
+    ):
+        """Handle client connection. Requests are processed in order,
+        so client can send several requests before reading replies
+
+        Args:
+            reader (asyncio.StreamReader): Connection reader
+            writer (asyncio.StreamWriter): Connection writer
+        """
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                writer.write((self.process(line.decode()) + '\n').encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+    async def start(self, host:str='127.0.0.1', port:int=0) -> int:
+        """Start serving
+
+        Args:
+            host (str, optional): Host. Defaults to '127.0.0.1'.
+            port (int, optional): Port. Defaults to 0 - any free port.
+
+        Returns:
+            int: Port of the server
+        """
+        self.server = await asyncio.start_server(
+            self.handle, host, port, limit=2**26
+        )
+        return self.server.sockets[0].getsockname()[1]
+
+
+    async def stop(self):
+        """Stop serving
+        """
+        self.server.close()
+        await self.server.wait_closed()
+
+
+
+class GameClient():
+    def __init__(self):
+        """Client of the GameServer. Keeps latency of each round trip
+        """
+        self._reader = None
+        self._writer = None
+        self.latencies = [] # Round trip times in seconds
+
+
+    async def connect(self, host:str='127.0.0.1', port:int=8888):
+        """Connect to the server
+
+        Args:
+            host (str, optional): Server host. Defaults to '127.0.0.1'.
+            port (int, optional): Server port. Defaults to 8888.
+        """
+        self._reader, self._writer = await asyncio.open_connection(
+            host, port, limit=2**26
+        )
+
+
+    async def close(self):
+        """Close the connection
+        """
+        self._writer.close()
+        await self._writer.wait_closed()
+
+
+    async def request_many(self, lines:list) -> list:
+        """Send several requests in one round trip and read their replies
+
+        Args:
+            lines (list): Request lines
+
+        Raises:
+            ValueError: If server replies with error
+
+        Returns:
+            list: Payloads of replies
+        """
+        start = time.perf_counter()
+        self._writer.write(''.join(line + '\n' for line in lines).encode())
+        await self._writer.drain()
+        replies = []
+        for _ in lines:
+            reply = (await self._reader.readline()).decode().rstrip('\n')
+            if not reply.startswith('OK'):
+                raise ValueError(reply)
+            replies.append(reply[3:])
+        self.latencies.append(time.perf_counter() - start)
+        return replies
+
+
+    async def new_sessions(self, count:int) -> np.ndarray:
+        """Open new sessions
+
+        Args:
+            count (int): Number of sessions
+
+        Returns:
+            np.ndarray: Session ids
+        """
+        return parse_numbers((await self.request_many([f'NEW {count}']))[0])
+
+
+    async def guess_many(self, batches:list) -> list:
+        """Send several batches of guesses in one round trip
+
+        Args:
+            batches (list): List of (session ids, guesses)
+
+        Returns:
+            list: Sign of (hidden number - guess) for each batch
+        """
+        replies = await self.request_many([
+            f'GUESS {format_numbers(ids)} {format_numbers(predict_numbers)}'
+                for ids, predict_numbers in batches
+        ])
+        return [
+            np.searchsorted(feedback_symbols, list(reply)) - 1
+                for reply in replies
+        ]
+
+
+    async def guess(self, ids:np.ndarray, predict_numbers:np.ndarray) \
+        -> np.ndarray:
+        """Send guesses of the sessions
+
+        Args:
+            ids (np.ndarray): Session ids
+            predict_numbers (np.ndarray): Guess for each session
+
+        Returns:
+            np.ndarray: Sign of (hidden number - guess) for each guess
+        """
+        return (await self.guess_many([(ids, predict_numbers)]))[0]
+
+
+    async def get_attempts(self, ids:np.ndarray) -> np.ndarray:
+        """Get number of attempts of the sessions
+
+        Args:
+            ids (np.ndarray): Session ids
+
+        Returns:
+            np.ndarray: Number of attempts
+        """
+        return parse_numbers(
+            (await self.request_many([f'ATTEMPTS {format_numbers(ids)}']))[0]
+        )
+
+
+    async def close_sessions(self, ids:np.ndarray):
+        """Close sessions
+
+        Args:
+            ids (np.ndarray): Session ids
+        """
+        await self.request_many([f'CLOSE {format_numbers(ids)}'])
+
+
+
+async def play_division_two(client:GameClient, ids:np.ndarray, \
+    min_val:int=1, max_val:int=100) -> np.ndarray:
+    """Guess hidden numbers of the sessions by predict_division_two
+    strategy. Guesses of all unsolved sessions are sent in one request
+    per step.
+
+    Args:
+        client (GameClient): Connected client
+        ids (np.ndarray): Session ids
+        min_val (int, optional): Minimum value of hidden number.
+            Defaults to 1.
+        max_val (int, optional): Maximum value of hidden number.
+            Defaults to 100.
+
+    Returns:
+        np.ndarray: Number of attempts for each session
+    """
+    count = np.zeros(len(ids), dtype=np.int64)
+    min_vals = np.full(len(ids), min_val, dtype=np.int64)
+    max_vals = np.full(len(ids), max_val, dtype=np.int64)
+    active = np.arange(len(ids)) # Indexes of unsolved sessions
+
+    while len(active):
+        count[active] += 1
+        # (min + max) // 2 without overflow of int64
+        predict_numbers = (min_vals[active] >> 1) + (max_vals[active] >> 1) \
+            + (min_vals[active] & max_vals[active] & 1)
+        signs = await client.guess(ids[active], predict_numbers)
+        less_mask = signs < 0 # Hidden number is less than guess
+        more_mask = signs > 0
+        max_vals[active[less_mask]] = predict_numbers[less_mask] - 1
+        min_vals[active[more_mask]] = predict_numbers[more_mask] + 1
+        active = active[signs != 0] # Exit, if we guess
+    return count
+
+
+async def serve(min_val:int=1, max_val:int=100, host:str='127.0.0.1', \
+    port:int=8888, max_sessions:int=max_sessions_default):
+    """Run server until it is cancelled
+
+    Args:
+        min_val (int, optional): Minimum value of hidden number.
+            Defaults to 1.
+        max_val (int, optional): Maximum value of hidden number.
+            Defaults to 100.
+        host (str, optional): Host. Defaults to '127.0.0.1'.
+        port (int, optional): Port. Defaults to 8888.
+        max_sessions (int, optional): Maximum number of opened
+            sessions. Defaults to 2**24.
+    """
+    server = GameServer(min_val, max_val, max_sessions=max_sessions)
+    port = await server.start(host, port)
+    print(f'Serving on {host}:{port}')
+    async with server.server:
+        await server.server.serve_forever()
+
+
+async def run_client_load(host:str, port:int, sessions:int, \
+    batch_size:int, min_val:int, max_val:int) -> GameClient:
+    """Play sessions by one client: batch_size sessions at once
+
+    Args:
+        host (str): Server host
+        port (int): Server port
+        sessions (int): Number of sessions
+        batch_size (int): Number of sessions played at once
+        min_val (int): Minimum value of hidden number
+        max_val (int): Maximum value of hidden number
+
+    Returns:
+        GameClient: Closed client with latencies
+    """
+    client = GameClient()
+    await client.connect(host, port)
+    for start in range(0, sessions, batch_size):
+        ids = await client.new_sessions(min(batch_size, sessions - start))
+        await play_division_two(client, ids, min_val, max_val)
+        await client.close_sessions(ids)
+    await client.close()
+    return client
+
+
+async def run_load_test(clients:int=8, sessions:int=10000, \
+    batch_size:int=1000, min_val:int=1, max_val:int=100, \
+    host:str=None, port:int=8888) -> dict:
+    """Load test of the server: clients play sessions concurrently
+
+    Args:
+        clients (int, optional): Number of concurrent clients.
+            Defaults to 8.
+        sessions (int, optional): Number of sessions of each client.
+            Defaults to 10000.
+        batch_size (int, optional): Number of sessions played by client
+            at once. Defaults to 1000.
+        min_val (int, optional): Minimum value of hidden number.
+            Defaults to 1.
+        max_val (int, optional): Maximum value of hidden number.
+            Defaults to 100.
+        host (str, optional): Server host. Defaults to None - start
+            local server in the current event loop.
+        port (int, optional): Server port. Defaults to 8888.
+
+    Returns:
+        dict: Sessions per second and round trip latency percentiles
+    """
+    server = None
+    if host is None:
+        server = GameServer(min_val, max_val)
+        host = '127.0.0.1'
+        port = await server.start(host, 0)
+
+    start = time.perf_counter()
+    played_clients = await asyncio.gather(*[
+        run_client_load(host, port, sessions, batch_size, min_val, max_val)
+            for _ in range(clients)
+    ])
+    elapsed = time.perf_counter() - start
+
+    if server is not None:
+        await server.stop()
+
+    latencies = np.concatenate([client.latencies
+                                for client in played_clients])
+    return {
+        'sessions': clients * sessions,
+        'seconds': elapsed,
+        'sessions_per_second': clients * sessions / elapsed,
+        'round_trips': len(latencies),
+        'latency_p50_ms': float(np.percentile(latencies, 50)) * 1e3,
+        'latency_p99_ms': float(np.percentile(latencies, 99)) * 1e3,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Guess number service and its load test'
+    )
+    parser.add_argument('--serve', action='store_true',
+                        help='Run server instead of load test')
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--sessions', type=int, default=10000,
+                        help='Sessions of each client')
+    parser.add_argument('--batch-size', type=int, default=1000,
+                        help='Sessions played by client at once')
+    parser.add_argument('--min-val', type=int, default=1)
+    parser.add_argument('--max-val', type=int, default=100)
+    parser.add_argument('--host', default=None,
+                        help='Server host. By default local server is started')
+    parser.add_argument('--port', type=int, default=8888)
+    parser.add_argument('--max-sessions', type=int,
+                        default=max_sessions_default,
+                        help='Maximum number of opened sessions of server')
+    args = parser.parse_args()
+
+    if args.serve:
+        asyncio.run(serve(args.min_val, args.max_val,
+                          args.host or '127.0.0.1', args.port,
+                          args.max_sessions))
+    else:
+        print(asyncio.run(run_load_test(
+            args.clients, args.sessions, args.batch_size,
+            args.min_val, args.max_val, args.host, args.port
+        )))
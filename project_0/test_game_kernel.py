@@ -0,0 +1,109 @@
+"""
+Goodness-of-fit tests of the sampling mode of random_predict.
+
+Attempts drawn by random_predict_sample are compared with attempts
+of games played by the scalar kernel (random_predict) and the batched
+kernel (random_predict_batch) by two-sample chi-square and
+Kolmogorov-Smirnov tests, and with the geometric distribution
+by one-sample tests.
+
+Usage:
+    python -m pytest test_game_kernel.py
+"""
+
+import numpy as np
+import pytest
+from scipy import stats
+
+from game_kernel import random_predict, random_predict_batch, \
+    random_predict_sample, random_numbers, max_geometric_span
+
+# Significance level. Seeds are fixed, so tests are repeatable
+alpha = 1e-3
+# Number of bins of the chi-square tests
+n_bins = 10
+
+# (min_val, max_val, number of scalar games)
+ranges = [(1, 10, 5000), (1, 100, 3000), (-50, 49, 3000), (1, 1000, 1000)]
+# Number of games for the sampling and batched kernels
+test_number = 20000
+
+def play_scalar(min_val:int, max_val:int, test_number:int, \
+    seed:int) -> np.ndarray:
+    """Play games by the scalar kernel one by one"""
+    np.random.seed(seed)
+    number_array = random_numbers(min_val, max_val, test_number)
+    return np.array([random_predict(number, min_val, max_val)
+                     for number in number_array])
+
+
+def play_kernel(kernel:callable, min_val:int, max_val:int, \
+    test_number:int, seed:int) -> np.ndarray:
+    """Get attempts of the batched or sampling kernel"""
+    np.random.seed(seed)
+    number_array = random_numbers(min_val, max_val, test_number)
+    return kernel(number_array, min_val, max_val)
+
+
+def get_bins(probability:float) -> np.ndarray:
+    """Get edges of bins with equal probabilities of the geometric
+    distribution. Bins are [edges[i], edges[i+1])"""
+    edges = stats.geom.ppf(np.arange(1, n_bins) / n_bins, probability)
+    return np.unique(np.concatenate([[1], edges + 1, [np.inf]]))
+
+
+def get_counts(attempts_numbers:np.ndarray, bins:np.ndarray) -> np.ndarray:
+    """Count attempts in bins"""
+    return np.histogram(np.asarray(attempts_numbers, dtype=float), bins)[0]
+
+
+@pytest.mark.parametrize('min_val, max_val, scalar_number', ranges)
+def test_sample_fits_geometric(min_val, max_val, scalar_number):
+    probability = 1 / (max_val - min_val + 1)
+    attempts_numbers = play_kernel(random_predict_sample, min_val, \
+        max_val, test_number, seed=1)
+
+    bins = get_bins(probability)
+    expected = np.diff(stats.geom.cdf(bins - 1, probability)) * test_number
+    assert stats.chisquare(get_counts(attempts_numbers, bins), \
+        expected).pvalue > alpha
+
+
+@pytest.mark.parametrize('slow_path', ['scalar', 'batch'])
+@pytest.mark.parametrize('min_val, max_val, scalar_number', ranges)
+def test_sample_matches_slow_path(slow_path, min_val, max_val, \
+    scalar_number):
+    sampled = play_kernel(random_predict_sample, min_val, max_val, \
+        test_number, seed=2)
+    if slow_path == 'scalar':
+        played = play_scalar(min_val, max_val, scalar_number, seed=3)
+    else:
+        played = play_kernel(random_predict_batch, min_val, max_val, \
+            test_number, seed=3)
+
+    # Two-sample chi-square test by contingency table of bins counts
+    bins = get_bins(1 / (max_val - min_val + 1))
+    table = np.array([get_counts(sampled, bins), get_counts(played, bins)])
+    table = table[:, table.sum(axis=0) > 0]
+    assert stats.chi2_contingency(table).pvalue > alpha
+
+    # Two-sample KS test. It is conservative for discrete distribution
+    assert stats.ks_2samp(sampled, played).pvalue > alpha
+
+    # The same range of attempts: no zero and no truncation
+    assert sampled.min() >= 1 and played.min() >= 1
+
+
+@pytest.mark.parametrize('max_val', [max_geometric_span * 2, 2**100])
+def test_wide_range_sample_fits_exponential(max_val):
+    # Slow paths are not feasible. Attempts multiplied by probability
+    # tend to the exponential distribution
+    probability = 1 / max_val
+    attempts_numbers = play_kernel(random_predict_sample, 1, max_val, \
+        test_number, seed=4)
+
+    assert attempts_numbers.dtype == object
+    assert min(attempts_numbers) >= 1
+    scaled = np.array([float(attempts) * probability
+                       for attempts in attempts_numbers])
+    assert stats.kstest(scaled, 'expon').pvalue > alpha
@@ -0,0 +1,63 @@
+"""
+Tests of the session store and request processing of game_service.py
+at the limits of int64 and of the number of sessions.
+
+Usage:
+    python -m pytest test_game_service.py
+"""
+
+import numpy as np
+import pytest
+
+from game_service import SessionStore, GameServer
+
+int64_min = int(np.iinfo(np.int64).min)
+int64_max = int(np.iinfo(np.int64).max)
+
+
+@pytest.mark.parametrize('hidden, guess, sign', [
+    (-5, int64_max, -1),
+    (int64_max, -5, 1),
+    (int64_min, int64_max, -1),
+    (int64_max, int64_min, 1),
+    (int64_max, int64_max, 0),
+    (int64_min, int64_min, 0),
+])
+def test_guess_feedback_at_int64_limits(hidden, guess, sign):
+    store = SessionStore(int64_min, int64_max, capacity=1, seed=1)
+    ids = store.create(1)
+    store.hidden[ids] = hidden
+    assert store.guess(ids, np.array([guess])).tolist() == [sign]
+
+
+def test_server_replies_feedback_at_int64_limits():
+    server = GameServer(int64_min, int64_max, seed=1)
+    server.process('NEW 1')
+    server.store.hidden[0] = -5
+    assert server.process(f'GUESS 0 {int64_max}') == 'OK <'
+    assert server.process(f'GUESS 0 {int64_min}') == 'OK >'
+    assert server.process('GUESS 0 -5') == 'OK ='
+
+
+@pytest.mark.parametrize('min_val, max_val', [
+    (int64_max - 10, int64_max),
+    (int64_min, int64_min + 10),
+    (int64_min, int64_max),
+])
+def test_hidden_numbers_at_int64_limits(min_val, max_val):
+    store = SessionStore(min_val, max_val, capacity=4, seed=1)
+    ids = store.create(1000)
+    hidden = store.hidden[ids]
+    assert min_val <= hidden.min() and hidden.max() <= max_val
+
+
+def test_sessions_limit():
+    server = GameServer(capacity=4, max_sessions=10)
+    assert server.process('NEW 1000000000000').startswith('ERR')
+    assert server.process('NEW 8').startswith('OK')
+    assert server.process('NEW 3').startswith('ERR')
+    assert server.process('NEW 2').startswith('OK')
+    assert server.store.capacity == 10
+    # Ids of closed sessions are reused within the limit
+    assert server.process('CLOSE 0,1') == 'OK'
+    assert server.process('NEW 2').startswith('OK')
@@ -0,0 +1,274 @@
+"""
+Benchmark of eda.py numeric helpers.
+
+Measures rows per second and peak memory of hav_distance, to_rad_np,
+get_bins_categories and their vectorized variants on synthetic data
+of different sizes. Each result is cross-checked on a sample of rows
+against the scalar implementation (hav, to_rad and per-bin quantiles).
+Results are saved in JSON for trend tracking.
+
+Usage:
+    python benchmark.py --output benchmark_results.json
+    python benchmark.py --min-rows-power 3 --max-rows-power 8
+Note, 10**8 rows need about 10 GB of memory.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import platform
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import eda
+
+def measure(func:callable, *args, **kwargs) -> tuple:
+    """Call function with time and peak memory measuring. 
+    tracemalloc slows down allocations, so time is measured in the first 
+    call and peak memory - in the second call under tracemalloc
+
+    Args:
+        func (callable): Measured function
+
+    Returns:
+        tuple: (function result, elapsed time in s, peak memory in bytes)
+    """
+    # Hide printed results of the measured functions
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+        
+        tracemalloc.start()
+        func(*args, **kwargs)
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return result, elapsed, peak_memory
+
+
+def get_coordinates(rows:int, random_state:int=42, \
+    decimals:int=4) -> pd.DataFrame:
+    """Get synthetic pairs of points (New York area) with repeated
+    locations and a few NaN coordinates
+
+    Args:
+        rows (int): Number of rows
+        random_state (int): Seed. Defaults to 42.
+        decimals (int): Coordinates are rounded to decimals, so locations
+            are repeated. Defaults to 4. None - not rounded.
+
+    Returns:
+        pd.DataFrame: lat_1, lng_1, lat_2, lng_2 columns
+    """
+    rng = np.random.default_rng(random_state)
+    round_values = lambda values: values if decimals is None \
+        else values.round(decimals)
+    data = pd.DataFrame({
+        'lat_1': round_values(rng.uniform(40.5, 41.0, rows)),
+        'lng_1': round_values(rng.uniform(-74.3, -73.7, rows)),
+        'lat_2': round_values(rng.uniform(40.5, 41.0, rows)),
+        'lng_2': round_values(rng.uniform(-74.3, -73.7, rows)),
+    })
+    data.iloc[::1000, 0] = np.nan
+    return data
+
+
+# SCALAR REFERENCES
+def scalar_hav_distance(lat_1:float, lng_1:float, lat_2:float, \
+    lng_2:float) -> float:
+    """Distance in km by scalar math as in the first eda.hav_distance"""
+    lat_1, lng_1, lat_2, lng_2 = [eda.to_rad(coordinate)
+        for coordinate in (lat_1, lng_1, lat_2, lng_2)]
+    if any(math.isnan(coordinate)
+           for coordinate in (lat_1, lng_1, lat_2, lng_2)):
+        return np.nan
+    return 2*eda.r*math.asin(math.sqrt(eda.hav(lat_2 - lat_1) +
+        math.cos(lat_1)*math.cos(lat_2)*eda.hav(lng_2 - lng_1)))
+
+
+def scalar_bins_categories(series:pd.Series, bins_num:int, \
+    method:str='') -> pd.Series:
+    """Categories by quantiles computed one by one"""
+    if method == 'quantiles':
+        bins = [series.min()]
+        bins.extend([series.quantile(q=x/bins_num)
+                     for x in range(1, bins_num)])
+        bins.append(series.max())
+    else:
+        bins = list(np.linspace(series.min(), series.max(), bins_num+1))
+    return pd.cut(series, bins=bins, labels=list(range(0, bins_num)),
+                  include_lowest=True)
+
+
+def get_max_error(result, reference) -> float:
+    """Maximum absolute error with NaN positions check"""
+    result = np.asarray(result, dtype=np.float64)
+    reference = np.asarray(reference, dtype=np.float64)
+    if (np.isnan(result) != np.isnan(reference)).any():
+        return np.inf
+    if np.isnan(reference).all():
+        return 0.0
+    return float(np.nanmax(np.abs(result - reference)))
+
+
+# BENCHMARK CASES
+# Grid cell of HavDistanceCache in degrees
+cache_cell_size = 1e-4
+# Each point is moved to the cell center by up to half of the cell 
+# diagonal, i.e. the distance error is up to the cell diagonal 
+# (lattitude degree is the longest one)
+cache_tolerance = math.sqrt(2) * eda.r * math.radians(cache_cell_size)
+
+# Name: (function of data, function of data sample for reference,
+#        tolerance of maximum absolute error, maximum rows)
+def get_cases(max_scalar_rows:int) -> dict:
+    distance = lambda data: [data[column] for column in data]
+    reference_distance = lambda data: [scalar_hav_distance(*row)
+        for row in data.itertuples(index=False)]
+    quantile_edges = lambda data: eda.get_bins_edges(
+        data['lat_1'], 10, 'quantiles')
+    return {
+        'hav_distance': (
+            lambda data: [eda.hav_distance(*row)
+                for row in data.itertuples(index=False)],
+            reference_distance, 1e-9, max_scalar_rows),
+        'hav_distance_np': (
+            lambda data: eda.hav_distance_np(*distance(data)),
+            reference_distance, 1e-9, None),
+        'hav_distance_np_float32': (
+            lambda data: eda.hav_distance_np(*distance(data),
+                                             dtype=np.float32),
+            reference_distance, 1e-2, None),
+        'HavDistanceCache': (
+            lambda data: eda.HavDistanceCache(cache_cell_size)\
+                .get_distance(*distance(data)),
+            reference_distance, cache_tolerance, None),
+        'to_rad_np': (
+            lambda data: eda.to_rad_np(data['lat_1'].to_numpy()),
+            lambda data: [eda.to_rad(x) for x in data['lat_1']],
+            1e-12, None),
+        'get_bins_categories': (
+            lambda data: eda.get_bins_categories(data['lat_1'], 10)\
+                .astype(float),
+            lambda data: scalar_bins_categories(data['lat_1'], 10)\
+                .astype(float),
+            0, None),
+        'get_bins_categories_quantiles': (
+            lambda data: eda.get_bins_categories(
+                data['lat_1'], 10, 'quantiles').astype(float),
+            lambda data: scalar_bins_categories(
+                data['lat_1'], 10, 'quantiles').astype(float),
+            0, None),
+        'Binner_partial_fit': (
+            lambda data: eda.Binner(10, 'quantiles')\
+                .partial_fit(data['lat_1']).bins,
+            quantile_edges, 1e-2, None),
+    }
+
+
+def bench_case(name:str, case:tuple, data:pd.DataFrame, \
+    check_data:pd.DataFrame) -> dict:
+    """Benchmark one helper on the data and cross-check it
+    with the scalar reference
+
+    Args:
+        name (str): Case name
+        case (tuple): Case of get_cases
+        data (pd.DataFrame): Synthetic data
+        check_data (pd.DataFrame): Sample for cross-check with not rounded 
+            coordinates, so errors of quantization are not hidden
+
+    Returns:
+        dict: Benchmark record
+    """
+    func, reference_func, tolerance, _ = case
+    _, elapsed, peak_memory = measure(func, data)
+
+    # Cross-check on the sample, edges - on all data
+    sample = data if name == 'Binner_partial_fit' else check_data
+    max_error = get_max_error(func(sample), reference_func(sample))
+    return {
+        'target': name,
+        'rows': len(data),
+        'seconds': elapsed,
+        'rows_per_second': len(data) / elapsed,
+        'peak_memory_bytes': peak_memory,
+        'max_abs_error': max_error,
+        'tolerance': tolerance,
+        'check_passed': bool(max_error <= tolerance),
+    }
+
+
+def run_benchmark(rows_powers:list, targets:list=None, \
+    max_scalar_rows:int=10**5, check_rows:int=1000, \
+    verbose:bool=True) -> list:
+    """Run benchmark for all helpers and data sizes
+
+    Args:
+        rows_powers (list): Powers of 10 for number of rows
+        targets (list): Names of cases. Defaults to None - all.
+        max_scalar_rows (int): Maximum rows for scalar helpers.
+            Defaults to 10**5.
+        check_rows (int): Number of rows in sample for cross-check.
+            Defaults to 1000.
+        verbose (bool): Print records. Defaults to True.
+
+    Returns:
+        list: Benchmark records
+    """
+    cases = get_cases(max_scalar_rows)
+    check_data = get_coordinates(check_rows, random_state=0, decimals=None)
+    results = []
+    for rows_power in rows_powers:
+        data = get_coordinates(10**rows_power)
+        for name, case in cases.items():
+            if targets is not None and name not in targets:
+                continue
+            max_rows = case[3]
+            if max_rows is not None and len(data) > max_rows:
+                continue
+            results.append(bench_case(name, case, data, check_data))
+            if verbose:
+                print(results[-1])
+        del data
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark eda helpers')
+    parser.add_argument('--output', default='benchmark_results.json',
+                        help='Path of JSON with results')
+    parser.add_argument('--min-rows-power', type=int, default=3)
+    parser.add_argument('--max-rows-power', type=int, default=7)
+    parser.add_argument('--max-scalar-rows', type=int, default=10**5,
+                        help='Skip scalar helpers on more rows')
+    parser.add_argument('--targets', nargs='*', default=None,
+                        help='Names of benchmarked helpers')
+    args = parser.parse_args()
+
+    results = run_benchmark(
+        range(args.min_rows_power, args.max_rows_power+1),
+        targets=args.targets, max_scalar_rows=args.max_scalar_rows,
+    )
+    report = {
+        'created': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'results': results,
+    }
+    with open(args.output, 'w') as json_file:
+        json.dump(report, json_file, indent=2)
+    print(f'Results saved to {args.output}')
+
+    failed = [record['target'] for record in results
+              if not record['check_passed']]
+    if failed:
+        raise SystemExit(f'Cross-check failed: {sorted(set(failed))}')
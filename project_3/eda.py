@@ -1,13 +1,16 @@
 import pandas as pd
 import math
 import numpy as np
+import os
+import json
+import hashlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 
-# Visualization Libs
-import matplotlib
-import matplotlib.pyplot as plt
-import seaborn as sns
+# Visualization Libs (matplotlib, seaborn) are imported on the first plot,
+# so the numerical helpers are imported fast without them
 
-def box_hist_plot(data: pd.DataFrame, x: str, title: str, hist_kde=False, hist_yscale='linear', box_showmeans=True, height_ratios=(.15, .85)) -> matplotlib.figure.Figure:
+def box_hist_plot(data: pd.DataFrame, x: str, title: str, hist_kde=False, hist_yscale='linear', box_showmeans=True, height_ratios=(.15, .85), aggregate=False, kde_sample_size=10**5) -> 'matplotlib.figure.Figure':
     """Plot Seaborn boxplot and histplot one above the other
 
     Args:
@@ -18,10 +21,15 @@ def box_hist_plot(data: pd.DataFrame, x: str, title: str, hist_kde=False, hist_y
         hist_yscale (str): Hist count axis Scale. Defaults to 'linear'.
         box_showmeans (bool): Show mean-value point with the marker. Defaults to True.
         height_ratios (tuple): Height ratios of the boxplot and histplot. Defaults to (.15, .85).
+        aggregate (bool): If True, plot from box statistics and histogram counts computed by get_box_hist_stats instead of raw data. Use for multi-million-row columns. Defaults to False.
+        kde_sample_size (int): Subsample size for KDE in aggregate mode. Defaults to 10**5.
 
     Returns:
         matplotlib.figure.Figure: Figure with seaborn boxplot and hitstplot
     """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    
     # Create a figure composed of two axes objects
     f, (ax_box, ax_hist) = plt.subplots(2, sharex=True, 
         gridspec_kw={
@@ -30,23 +38,265 @@ def box_hist_plot(data: pd.DataFrame, x: str, title: str, hist_kde=False, hist_y
     # Set up figure
     f.suptitle(title);
     f.tight_layout()
+    meanprops = {"marker":"1",
+                 "markeredgecolor":"white",
+                 "markersize":"10"}
 
-    # Plot boxplot
-    sns.boxplot(data=data, x=x, showmeans=box_showmeans, 
-                meanprops={"marker":"1",
-                        "markeredgecolor":"white",
-                        "markersize":"10"}, 
-                ax=ax_box)
-    ax_box.set(xlabel=None)
+    if aggregate:
+        stats = get_box_hist_stats(data[x], 
+            kde_sample_size=kde_sample_size if hist_kde else 0)
+        plot_box_hist_stats(stats, ax_box, ax_hist, box_showmeans, 
+                            meanprops)
+        ax_hist.set_xlabel(x)
+    else:
+        # Plot boxplot
+        sns.boxplot(data=data, x=x, showmeans=box_showmeans, 
+                    meanprops=meanprops, 
+                    ax=ax_box)
 
-    # Plot histplot
-    sns.histplot(data=data, x=x, kde=hist_kde, ax=ax_hist)
+        # Plot histplot
+        sns.histplot(data=data, x=x, kde=hist_kde, ax=ax_hist)
+    ax_box.set(xlabel=None)
     ax_hist.set_yscale(hist_yscale)
     plt.close(f)    
     # Return figure
     return f
 
 
+def get_box_hist_stats(series: pd.Series, bins='auto', whis: float=1.5, 
+    fliers_sample_size: int=1000, kde_sample_size: int=10**5, 
+    random_state: int=0) -> dict:
+    """Compute box statistics and histogram counts for box_hist_plot.
+    The result size does not depend on the series size.
+
+    Args:
+        series (pd.Series): Numerical series. NaN values are skipped
+        bins (int, str or list): Histogram bins as in np.histogram. 
+            Defaults to 'auto' as in seaborn histplot.
+        whis (float): Whiskers length in IQR. Defaults to 1.5.
+        fliers_sample_size (int): Maximum number of plotted outliers. 
+            Minimum and maximum are always kept. Defaults to 1000.
+        kde_sample_size (int): Size of subsample for KDE. 
+            If 0, KDE is not computed. Defaults to 10**5.
+        random_state (int): Seed of subsampling. Defaults to 0.
+
+    Returns:
+        dict: box - matplotlib bxp statistics (None for empty series); 
+            edges and counts - histogram (empty for empty series); 
+            kde_x and kde_y - KDE in counts (or None)
+    """
+    rng = np.random.default_rng(random_state)
+    values = np.asarray(series, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return {'box': None, 'edges': np.empty(0), 
+                'counts': np.empty(0, dtype=np.int64), 
+                'kde_x': None, 'kde_y': None}
+    q1, med, q3 = np.percentile(values, [25, 50, 75])
+    iqr = q3 - q1
+    
+    # Whiskers - the most extreme values within whis*IQR
+    inside = (values >= q1 - whis*iqr) & (values <= q3 + whis*iqr)
+    fliers = values[~inside]
+    if len(fliers) > fliers_sample_size:
+        fliers = np.concatenate([
+            [fliers.min(), fliers.max()],
+            rng.choice(fliers, fliers_sample_size-2, replace=False)
+        ])
+    box = {
+        'med': med, 'q1': q1, 'q3': q3, 
+        'whislo': values[inside].min(), 'whishi': values[inside].max(), 
+        'mean': values.mean(), 'fliers': fliers,
+    }
+    
+    counts, edges = np.histogram(values, bins=bins)
+    
+    kde_x = kde_y = None
+    if kde_sample_size:
+        sample = values
+        if len(values) > kde_sample_size:
+            sample = rng.choice(values, kde_sample_size, replace=False)
+        # Gaussian KDE with Scott's bandwidth as in seaborn
+        bandwidth = sample.std(ddof=1) * len(sample)**(-1/5)
+        if bandwidth > 0:
+            kde_x = np.linspace(edges[0], edges[-1], 200)
+            kde_y = np.zeros_like(kde_x)
+            for start in range(0, len(sample), 10**4):
+                z = (kde_x[:, None] - sample[None, start:start+10**4]) \
+                    / bandwidth
+                kde_y += np.exp(-z**2/2).sum(axis=1)
+            # Density scaled to histogram counts
+            kde_y *= np.diff(edges).mean() * len(values) \
+                / (len(sample) * bandwidth * np.sqrt(2*np.pi))
+    return {'box': box, 'edges': edges, 'counts': counts, 
+            'kde_x': kde_x, 'kde_y': kde_y}
+
+
+def plot_box_hist_stats(stats: dict, ax_box, ax_hist, 
+    box_showmeans=True, meanprops: dict=None):
+    """Plot boxplot and histplot from get_box_hist_stats result
+
+    Args:
+        stats (dict): Result of get_box_hist_stats
+        ax_box (matplotlib.axes.Axes): Axes for boxplot
+        ax_hist (matplotlib.axes.Axes): Axes for histplot
+        box_showmeans (bool): Show mean-value point. Defaults to True.
+        meanprops (dict): Mean marker properties. Defaults to None.
+    """
+    import seaborn as sns
+    
+    ax_box.set_yticks([])
+    # Empty axes for empty series
+    if stats['box'] is None:
+        return
+    color = sns.color_palette()[0]
+    ax_box.bxp([stats['box']], vert=False, showmeans=box_showmeans, 
+               meanprops=meanprops, patch_artist=True, widths=.8,
+               boxprops={'facecolor': sns.desaturate(color, .75), 
+                         'edgecolor': '.25'},
+               whiskerprops={'color': '.25'}, capprops={'color': '.25'},
+               medianprops={'color': '.25'},
+               flierprops={'marker': 'o', 'markerfacecolor': 'none', 
+                           'markeredgecolor': '.25'})
+    
+    edges = stats['edges']
+    hist_data = pd.DataFrame({'x': edges[:-1], 'counts': stats['counts']})
+    sns.histplot(data=hist_data, x='x', weights='counts', bins=list(edges), 
+                 ax=ax_hist)
+    if stats['kde_x'] is not None:
+        ax_hist.plot(stats['kde_x'], stats['kde_y'], color=color)
+
+
+def get_spec_hash(column: str, title: str, options: dict) -> str:
+    """Get hash of the plot spec: column name, title and plot options
+
+    Args:
+        column (str): Plotted column
+        title (str): Figure (plot) name
+        options (dict): box_hist_plot keyword arguments
+
+    Returns:
+        str: sha256 hex digest
+    """
+    return hashlib.sha256(json.dumps(
+        [column, title, options], sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def get_plot_hash(series: pd.Series, title: str, options: dict) -> str:
+    """Get content hash of the plot: column data, title 
+    and plot options
+
+    Args:
+        series (pd.Series): Plotted column
+        title (str): Figure (plot) name
+        options (dict): box_hist_plot keyword arguments
+
+    Returns:
+        str: sha256 hex digest
+    """
+    values = series.to_numpy()
+    content = hashlib.sha256()
+    content.update(str(values.dtype).encode())
+    if values.dtype == object:
+        content.update(pd.util.hash_pandas_object(series, index=False)\
+            .to_numpy().tobytes())
+    else:
+        content.update(np.ascontiguousarray(values).tobytes())
+    content.update(get_spec_hash(series.name, title, options).encode())
+    return content.hexdigest()
+
+
+def save_box_hist_plot(series: pd.Series, title: str, options: dict, 
+    paths: list):
+    """Plot box_hist_plot of the column and save it in files
+
+    Args:
+        series (pd.Series): Plotted column
+        title (str): Figure (plot) name
+        options (dict): box_hist_plot keyword arguments
+        paths (list): Paths of saved files
+    """
+    f = box_hist_plot(series.to_frame(), series.name, title, **options)
+    for path in paths:
+        f.savefig(path, bbox_inches='tight')
+
+
+def export_box_hist_plots(data: pd.DataFrame, specs: list, output_dir: str, 
+    file_formats: tuple=('png',), n_workers: int=None, 
+    use_cache: bool=True) -> list:
+    """Plot box_hist_plot for the list of columns on the process pool 
+    and save figures in files 
+    {output_dir}/{column}_{spec hash}.{file_format}, where spec hash 
+    is the first 8 characters of get_spec_hash. 
+    The file name depends on the spec only, so it is the same 
+    in every call.
+    Hashes of saved plots are kept in {output_dir}/plots_cache.json, 
+    plots with unchanged column data and options are not redrawn.
+
+    Args:
+        data (pd.DataFrame): Data for plotting
+        specs (list): Tuples (column, title, options), 
+            options - dict of box_hist_plot keyword arguments
+        output_dir (str): Directory of saved figures
+        file_formats (tuple): File formats. Defaults to ('png',).
+        n_workers (int): Number of processes. If 1, plots are drawn 
+            in the current process. Defaults to None - number of CPUs.
+        use_cache (bool): Skip unchanged plots. Defaults to True.
+
+    Returns:
+        list: Dicts with column, paths and cached flag for each spec
+
+    Raises:
+        ValueError: The same spec is repeated
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    cache_path = os.path.join(output_dir, 'plots_cache.json')
+    cache = {}
+    if use_cache and os.path.exists(cache_path):
+        with open(cache_path) as cache_file:
+            cache = json.load(cache_file)
+    
+    results = []
+    jobs = []
+    names = set()
+    for column, title, options in specs:
+        options = options or {}
+        # File name of each spec must be unique: plots of the same file 
+        # would be drawn concurrently
+        name = f'{column}_{get_spec_hash(column, title, options)[:8]}'
+        if name in names:
+            raise ValueError(f'Repeated spec of column {column}')
+        names.add(name)
+        
+        plot_hash = get_plot_hash(data[column], title, options)
+        paths = []
+        for file_format in file_formats:
+            path = os.path.join(output_dir, f'{name}.{file_format}')
+            if cache.get(path) != plot_hash or not os.path.exists(path):
+                paths.append(path)
+                cache[path] = plot_hash
+        results.append({'column': column, 'paths': paths, 
+                        'cached': not paths})
+        if paths:
+            jobs.append((data[column], title, options, paths))
+    
+    if n_workers == 1 or len(jobs) <= 1:
+        for job in jobs:
+            save_box_hist_plot(*job)
+    elif jobs:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            futures = [executor.submit(save_box_hist_plot, *job) 
+                       for job in jobs]
+            for future in futures:
+                future.result()
+    
+    # Save cache after all figures are written
+    with open(cache_path, 'w') as cache_file:
+        json.dump(cache, cache_file, indent=2)
+    return results
+
+
 def get_bins_categories(series: pd.Series, bins_num: int, 
     method: str='')->pd.Series:
     """Retrieve categorical series from numerical with ordered int labels
@@ -63,13 +313,7 @@ def get_bins_categories(series: pd.Series, bins_num: int,
         ordered categorical Series
     """
     # Get bins
-    if method=='quantiles':
-        bins = [series.min()]
-        bins.extend([series\
-            .quantile(q=x/10) for x in list(range(1,bins_num))])
-        bins.append(series.max())
-    else:
-        bins = list(np.linspace(series.min(), series.max(), bins_num+1))
+    bins = get_bins_edges(series, bins_num, method)
         
     # Get labels
     labels=list(range(0,bins_num))
@@ -78,6 +322,206 @@ def get_bins_categories(series: pd.Series, bins_num: int,
     return pd.cut(series, bins=bins, labels=labels, include_lowest=True)
 
 
+def get_bins_edges(series: pd.Series, bins_num: int, 
+    method: str='')->list:
+    """Retrieve bins edges of numerical series in one pass
+
+    Args:
+        series (pd.Series): Source series
+        bins_num (int): Number of bins
+        method (str): Method of cutting: 
+            default '' - linear bins
+            quantiles - by quantiles
+
+    Returns:
+        list: bins_num+1 bins edges
+    """
+    if method=='quantiles':
+        # All inner quantiles by one sorting
+        bins = [series.min()]
+        bins.extend(series.quantile(
+            q=np.arange(1, bins_num)/bins_num).tolist())
+        bins.append(series.max())
+    else:
+        bins = list(np.linspace(series.min(), series.max(), bins_num+1))
+    return bins
+
+
+class QuantileSketch():
+    def __init__(self, compression:float=200):
+        """Mergeable approximate quantile sketch (t-digest like).
+        Data is kept as weighted centroids, which are small near 
+        the tails and large near the median, so the number of centroids 
+        is about compression regardless of the data size.
+
+        Args:
+            compression (float, optional): Accuracy parameter. 
+                Defaults to 200.
+        """
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = np.inf
+        self.max = -np.inf
+    
+    
+    @property
+    def count(self)->float:
+        return self.weights.sum()
+    
+    
+    def _compress(self, means:np.ndarray, weights:np.ndarray):
+        """Merge sorted points into the centroids by the scale function"""
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        # Quantile of the point center
+        q = (np.cumsum(weights) - weights/2) / total
+        # Scale function k1: centroid width in k is less than 1
+        k = self.compression / (2*np.pi) * np.arcsin(2*q - 1)
+        groups = np.floor(k - k[0]).astype(np.int64)
+        groups = np.unique(groups, return_inverse=True)[1]
+        self.weights = np.bincount(groups, weights=weights)
+        self.means = np.bincount(groups, weights=means*weights) \
+            / self.weights
+    
+    
+    def update(self, values):
+        """Add values to the sketch. NaN values are skipped
+
+        Args:
+            values (array-like): New values
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        self._compress(np.concatenate([self.means, values]), 
+                       np.concatenate([self.weights, 
+                                       np.ones(len(values))]))
+        return self
+    
+    
+    def merge(self, other:'QuantileSketch'):
+        """Add centroids of other sketch, e.g. fitted on other chunk
+
+        Args:
+            other (QuantileSketch): Other sketch
+        """
+        if len(other.means) == 0:
+            return self
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress(np.concatenate([self.means, other.means]), 
+                       np.concatenate([self.weights, other.weights]))
+        return self
+    
+    
+    def quantile(self, q):
+        """Get approximate quantiles
+
+        Args:
+            q (float or array-like): Quantiles from 0 to 1
+
+        Returns:
+            float or np.ndarray: Quantile values
+        """
+        if len(self.means) == 0:
+            return np.full(np.shape(q), np.nan)
+        # Interpolate between centroids centers, tails by min and max
+        centers = np.cumsum(self.weights) - self.weights/2
+        ranks = np.concatenate([[0], centers, [self.count]])
+        values = np.concatenate([[self.min], self.means, [self.max]])
+        return np.interp(np.asarray(q)*self.count, ranks, values)
+
+
+class Binner():
+    def __init__(self, bins_num:int, method:str='', 
+        compression:float=200):
+        """Categorizer of numerical series with ordered int labels. 
+        Bins edges are fitted once and reused for other data 
+        (e.g. train and test).
+        fit - exact edges on the whole series;
+        partial_fit - approximate edges on data chunks 
+        with QuantileSketch.
+
+        Args:
+            bins_num (int): Number of bins
+            method (str): Method of cutting: 
+                default '' - linear bins
+                quantiles - by quantiles
+            compression (float, optional): Accuracy of QuantileSketch. 
+                Defaults to 200.
+        """
+        self.bins_num = bins_num
+        self.method = method
+        self.sketch = QuantileSketch(compression)
+        self.bins = None
+    
+    
+    def fit(self, series:pd.Series):
+        """Fit exact bins edges
+
+        Args:
+            series (pd.Series): Source series
+        """
+        self.bins = get_bins_edges(series, self.bins_num, self.method)
+        return self
+    
+    
+    def partial_fit(self, series:pd.Series):
+        """Update approximate bins edges by the data chunk
+
+        Args:
+            series (pd.Series): Source series chunk
+        """
+        self.sketch.update(series)
+        self.bins = self._get_sketch_bins()
+        return self
+    
+    
+    def merge(self, other:'Binner'):
+        """Add data of other binner fitted by partial_fit, 
+        e.g. in other process
+
+        Args:
+            other (Binner): Other binner
+        """
+        self.sketch.merge(other.sketch)
+        self.bins = self._get_sketch_bins()
+        return self
+    
+    
+    def _get_sketch_bins(self)->list:
+        if self.method=='quantiles':
+            q = np.arange(0, self.bins_num+1)/self.bins_num
+            return self.sketch.quantile(q).tolist()
+        return list(np.linspace(self.sketch.min, self.sketch.max, 
+                                self.bins_num+1))
+    
+    
+    def transform(self, series:pd.Series)->pd.Series:
+        """Cut series by fitted bins. Values out of bins are NaN
+
+        Args:
+            series (pd.Series): Source series
+
+        Returns:
+            pd.Series: Ordered categorical Series
+        """
+        if self.bins is None:
+            raise ValueError('Binner is not fitted')
+        labels=list(range(0,self.bins_num))
+        return pd.cut(series, bins=self.bins, labels=labels, 
+                      include_lowest=True)
+    
+    
+    def fit_transform(self, series:pd.Series)->pd.Series:
+        return self.fit(series).transform(series)
+
+
 # GET EARTH DISTANCE
 # Earh radius in km
 r = 6371.0 # km
@@ -100,14 +544,105 @@ def to_rad(theta_deg:float)->float:
         theta_deg (float): angle in degrees
 
     Returns:
-        float: _description_
+        float: angle in radians
     """
     return theta_deg/180 * math.pi
-to_rad_np = np.vectorize(to_rad)
+
+def to_rad_np(theta_deg:np.ndarray)->np.ndarray:
+    """Convert array of degrees to radians
+
+    Args:
+        theta_deg (np.ndarray): angles in degrees
+
+    Returns:
+        np.ndarray: angles in radians
+    """
+    return np.asarray(theta_deg)/180 * np.pi
+
+def hav_distance_np(lat_1, lng_1, lat_2, lng_2, dtype=np.float64, 
+    out:np.ndarray=None):
+    """Calculate distances in km between two arrays of points on the Earth 
+    by the haversin formula. Computation is done by vectorized ufuncs 
+    in place of the result buffer (out) and two temporary arrays.
+
+    Args:
+        lat_1 (np.ndarray | pd.Series): First points lattitudes
+        lng_1 (np.ndarray | pd.Series): First points longitutes
+        lat_2 (np.ndarray | pd.Series): Second points lattitudes
+        lng_2 (np.ndarray | pd.Series): Second points longitutes
+        dtype (optional): np.float32 or np.float64. Defaults to np.float64.
+        out (np.ndarray, optional): Buffer for the result of dtype. 
+            Defaults to None.
+
+    Returns:
+        np.ndarray | pd.Series: Earth distances in km. NaN, if some 
+        coordinate of the pair is NaN. Series with index of the first 
+        Series argument, if there is such and out is not set.
+    """
+    index = None
+    for coordinate in (lat_1, lng_1, lat_2, lng_2):
+        if isinstance(coordinate, pd.Series):
+            index = coordinate.index
+            break
+    
+    dtype = np.dtype(dtype).type
+    lat_1, lng_1, lat_2, lng_2 = np.broadcast_arrays(*[
+        np.asarray(coordinate, dtype=dtype) 
+            for coordinate in (lat_1, lng_1, lat_2, lng_2)
+    ])
+    result = out
+    if result is None:
+        result = np.empty(lat_1.shape, dtype=dtype)
+    pi, deg = dtype(np.pi), dtype(180)
+    
+    # Pairs with NaN coordinates
+    nan_mask = np.isnan(lat_1) | np.isnan(lng_1) \
+        | np.isnan(lat_2) | np.isnan(lng_2)
+    
+    # hav(lng_2 - lng_1) in radians
+    temp = np.divide(lng_2, deg, dtype=dtype)
+    temp *= pi
+    temp_2 = np.divide(lng_1, deg, dtype=dtype)
+    temp_2 *= pi
+    temp -= temp_2
+    temp /= 2
+    np.sin(temp, out=temp)
+    np.square(temp, out=temp)
+    # cos(lat_1)*cos(lat_2)*hav(lng_2 - lng_1)
+    np.divide(lat_1, deg, out=result)
+    result *= pi
+    np.cos(result, out=result)
+    np.divide(lat_2, deg, out=temp_2)
+    temp_2 *= pi
+    np.cos(temp_2, out=temp_2)
+    result *= temp_2
+    temp *= result
+    # hav(lat_2 - lat_1) in radians
+    np.divide(lat_2, deg, out=result)
+    result *= pi
+    np.divide(lat_1, deg, out=temp_2)
+    temp_2 *= pi
+    result -= temp_2
+    result /= 2
+    np.sin(result, out=result)
+    np.square(result, out=result)
+    # 2*r*asin(sqrt(hav(lat_2 - lat_1) + cos*cos*hav(lng_2 - lng_1)))
+    result += temp
+    # Rounding can give a bit more than 1 for antipodal points
+    np.clip(result, 0, 1, out=result)
+    np.sqrt(result, out=result)
+    np.arcsin(result, out=result)
+    result *= dtype(2*r)
+    result[nan_mask] = np.nan
+    
+    if out is None and index is not None:
+        return pd.Series(result, index=index)
+    return result
 
 def hav_distance(lat_1:float, lng_1:float, lat_2:float, lng_2:float)->float:
     """Calculate distance in km between two point on the Earth 
-    by the haversin formula
+    by the haversin formula. Scalar version of hav_distance_np 
+    for row-wise apply
 
     Args:
         lat_1 (float): First point lattitude
@@ -116,17 +651,419 @@ def hav_distance(lat_1:float, lng_1:float, lat_2:float, lng_2:float)->float:
         lng_2 (float): Second point longitute
 
     Returns:
-        float: Earth distance in km
+        float: Earth distance in km. NaN, if some coordinate is NaN
     """
-    coordinates = to_rad_np(np.array([
-        [lat_1, lng_1],
-        [lat_2, lng_2]
-    ]))
-    
-    if np.isnan(coordinates).any():
+    lat_1, lng_1, lat_2, lng_2 = to_rad(lat_1), to_rad(lng_1), \
+        to_rad(lat_2), to_rad(lng_2)
+    if math.isnan(lat_1 + lng_1 + lat_2 + lng_2):
         return np.nan
     
-    return 2*r*math.asin(math.sqrt(hav(coordinates[1,0] - coordinates[0,0]) +\
-    math.cos(coordinates[0,0])*math.cos(coordinates[1,0])*\
-        hav(coordinates[1,1] - coordinates[0,1])))
+    hav_sum = hav(lat_2 - lat_1) \
+        + math.cos(lat_1)*math.cos(lat_2)*hav(lng_2 - lng_1)
+    # Rounding can give a bit more than 1 for antipodal points
+    return 2*r*math.asin(math.sqrt(min(max(hav_sum, 0.0), 1.0)))
+
+
+# DISTANCE CACHE
+# Odd constants for mixing quantized coordinates into 64-bit hash
+hash_multipliers = np.array([
+    0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 
+    0x165667B19E3779F9, 0xD6E8FEB86659FD93,
+], dtype=np.uint64)
+
+class HavDistanceCache():
+    def __init__(self, cell_size:float=1e-4, max_size:int=10**6):
+        """Memoized hav_distance_np for repeated coordinate pairs.
+        Coordinates are quantized to the grid cell (in degrees), 
+        distance is computed once for each unique pair of cells 
+        between cell centers and kept in LRU cache between batches.
+        Error of distance is up to cell_size*111 km per point 
+        (e.g. ~11 m for 1e-4).
+        Cache is kept in sorted NumPy arrays, lookups are vectorized, 
+        least recently used batches are evicted.
+
+        Args:
+            cell_size (float, optional): Grid cell size in degrees. 
+                Defaults to 1e-4.
+            max_size (int, optional): Maximum number of cached pairs. 
+                Defaults to 10**6.
+        """
+        self.cell_size = cell_size
+        self.max_size = max_size
+        self.clear()
+    
+    
+    def clear(self):
+        """Clear cache and counters"""
+        self.hashes = np.empty(0, dtype=np.uint64)
+        self.cells = np.empty((0, 4), dtype=np.int64)
+        self.distances = np.empty(0)
+        self.stamps = np.empty(0, dtype=np.int64)
+        self.batch_number = 0
+        self.hits = 0
+        self.misses = 0
+    
+    
+    def info(self)->dict:
+        """Get cache counters
+
+        Returns:
+            dict: hits - rows without computing, misses - computed pairs, 
+                hit_rate, size - cached pairs
+        """
+        rows = self.hits + self.misses
+        return {
+            'hits': self.hits, 'misses': self.misses, 
+            'hit_rate': self.hits / rows if rows else 0.0, 
+            'size': len(self.hashes),
+        }
+    
+    
+    def _get_hashes(self, cells:np.ndarray)->np.ndarray:
+        with np.errstate(over='ignore'):
+            hashes = (cells.astype(np.uint64) * hash_multipliers)
+            hashes = np.bitwise_xor.reduce(hashes, axis=1)
+            hashes ^= hashes >> np.uint64(31)
+        return hashes
+    
+    
+    def get_distance(self, lat_1, lng_1, lat_2, lng_2):
+        """Calculate distances in km as hav_distance_np by cache
+
+        Args:
+            lat_1 (np.ndarray | pd.Series): First points lattitudes
+            lng_1 (np.ndarray | pd.Series): First points longitutes
+            lat_2 (np.ndarray | pd.Series): Second points lattitudes
+            lng_2 (np.ndarray | pd.Series): Second points longitutes
+
+        Returns:
+            np.ndarray | pd.Series: Earth distances in km. 
+            Series with index of the first Series argument, if there is such
+        """
+        index = None
+        for coordinate in (lat_1, lng_1, lat_2, lng_2):
+            if isinstance(coordinate, pd.Series):
+                index = coordinate.index
+                break
+        coordinates = np.stack(np.broadcast_arrays(*[
+            np.asarray(coordinate, dtype=np.float64).ravel()
+                for coordinate in (lat_1, lng_1, lat_2, lng_2)
+        ]), axis=1)
+        result = np.full(len(coordinates), np.nan)
+        valid = np.flatnonzero(~np.isnan(coordinates).any(axis=1))
+        self.batch_number += 1
+        
+        # Dedupe pairs of cells in batch
+        cells = np.round(coordinates[valid] / self.cell_size)\
+            .astype(np.int64)
+        hashes = self._get_hashes(cells)
+        unique_hashes, first, inverse = np.unique(
+            hashes, return_index=True, return_inverse=True)
+        unique_cells = cells[first]
+        # Pairs with hash collision in batch are computed directly
+        collision = (unique_cells[inverse] != cells).any(axis=1)
+        
+        # Lookup in cache
+        position = np.searchsorted(self.hashes, unique_hashes)
+        position[position == len(self.hashes)] = 0
+        found = np.zeros(len(unique_hashes), dtype=bool)
+        if len(self.hashes):
+            found = (self.hashes[position] == unique_hashes) \
+                & (self.cells[position] == unique_cells).all(axis=1)
+        unique_distances = np.empty(len(unique_hashes))
+        unique_distances[found] = self.distances[position[found]]
+        self.stamps[position[found]] = self.batch_number
+        
+        # Compute new pairs between cells centers
+        missed = ~found
+        centers = unique_cells[missed] * self.cell_size
+        unique_distances[missed] = hav_distance_np(*centers.T)
+        
+        # Scatter back
+        distances = unique_distances[inverse]
+        if collision.any():
+            distances[collision] = hav_distance_np(
+                *(cells[collision] * self.cell_size).T)
+        result[valid] = distances
+        self.misses += int(missed.sum() + collision.sum())
+        self.hits += len(valid) - int(missed.sum() + collision.sum())
+        
+        self._insert(unique_hashes[missed], unique_cells[missed], 
+                     unique_distances[missed])
+        if index is not None:
+            return pd.Series(result, index=index)
+        return result.reshape(np.shape(lat_1)) \
+            if np.ndim(lat_1) > 1 else result
+    
+    
+    def _insert(self, hashes:np.ndarray, cells:np.ndarray, 
+        distances:np.ndarray):
+        """Add new pairs, evict least recently used over max_size"""
+        hashes = np.concatenate([self.hashes, hashes])
+        cells = np.concatenate([self.cells, cells])
+        distances = np.concatenate([self.distances, distances])
+        stamps = np.concatenate([
+            self.stamps, 
+            np.full(len(hashes) - len(self.hashes), self.batch_number)
+        ])
+        keep = np.arange(len(hashes))
+        if len(hashes) > self.max_size:
+            keep = np.argpartition(-stamps, self.max_size-1)\
+                [:self.max_size]
+        keep = keep[np.argsort(hashes[keep], kind='stable')]
+        self.hashes, self.cells = hashes[keep], cells[keep]
+        self.distances, self.stamps = distances[keep], stamps[keep]
+
+
+# SPATIAL INDEX
+class HavIndex():
+    def __init__(self, lat, lng, leaf_size:int=40):
+        """Spatial index of the reference points (landmarks, city centers) 
+        for k-nearest and within-radius queries by haversin distance. 
+        Index is built once by sklearn BallTree with haversine metric.
+
+        Args:
+            lat (np.ndarray | pd.Series): Reference points lattitudes
+            lng (np.ndarray | pd.Series): Reference points longitutes
+            leaf_size (int, optional): Leaf size of the BallTree. 
+                Defaults to 40.
+
+        Raises:
+            ValueError: If some reference coordinate is NaN
+        """
+        from sklearn.neighbors import BallTree
+        
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.lng = np.asarray(lng, dtype=np.float64)
+        if np.isnan(self.lat).any() or np.isnan(self.lng).any():
+            raise ValueError('Reference points must not have NaN coordinates')
+        self.tree = BallTree(
+            to_rad_np(np.column_stack([self.lat, self.lng])),
+            leaf_size=leaf_size,
+            metric='haversine'
+        )
+    
+    
+    def _get_batches(self, lat, lng, batch_size:int):
+        """Split query points by batches without NaN coordinates
+
+        Args:
+            lat (np.ndarray | pd.Series): Query points lattitudes
+            lng (np.ndarray | pd.Series): Query points longitutes
+            batch_size (int): Number of points in batch
+
+        Yields:
+            tuple: (indexes of points in batch, lat, lng)
+        """
+        lat = np.asarray(lat, dtype=np.float64)
+        lng = np.asarray(lng, dtype=np.float64)
+        for start in range(0, len(lat), batch_size):
+            batch_lat = lat[start:start+batch_size]
+            batch_lng = lng[start:start+batch_size]
+            valid = np.flatnonzero(
+                ~(np.isnan(batch_lat) | np.isnan(batch_lng))
+            )
+            yield start + valid, batch_lat[valid], batch_lng[valid]
+    
+    
+    def query(self, lat, lng, k:int=1, batch_size:int=2**18) -> tuple:
+        """Find k nearest reference points for each query point
+
+        Args:
+            lat (np.ndarray | pd.Series): Query points lattitudes
+            lng (np.ndarray | pd.Series): Query points longitutes
+            k (int, optional): Number of neighbours. Defaults to 1.
+            batch_size (int, optional): Number of points queried at once. 
+                Defaults to 2**18.
+
+        Returns:
+            tuple: (distances in km, indexes of reference points) - 
+            arrays of shape (n, k) sorted by distance. 
+            NaN and -1 for points with NaN coordinates
+        """
+        n = len(lat)
+        distances = np.full((n, k), np.nan)
+        indexes = np.full((n, k), -1, dtype=np.int64)
+        
+        for rows, batch_lat, batch_lng in self._get_batches(lat, lng, 
+                                                            batch_size):
+            if len(rows) == 0:
+                continue
+            batch_indexes = self.tree.query(
+                to_rad_np(np.column_stack([batch_lat, batch_lng])), 
+                k=k, return_distance=False
+            )
+            indexes[rows] = batch_indexes
+            # Distances by the same formula as hav_distance
+            distances[rows] = hav_distance_np(
+                batch_lat[:, None], batch_lng[:, None],
+                self.lat[batch_indexes], self.lng[batch_indexes]
+            )
+        return distances, indexes
+    
+    
+    def query_radius(self, lat, lng, radius:float, 
+        batch_size:int=2**18) -> tuple:
+        """Find reference points within radius for each query point
+
+        Args:
+            lat (np.ndarray | pd.Series): Query points lattitudes
+            lng (np.ndarray | pd.Series): Query points longitutes
+            radius (float): Radius in km
+            batch_size (int, optional): Number of points queried at once. 
+                Defaults to 2**18.
+
+        Returns:
+            tuple: (distances in km, indexes of reference points) - 
+            object arrays with array for each query point sorted 
+            by distance. Empty arrays for points with NaN coordinates
+        """
+        n = len(lat)
+        distances = np.empty(n, dtype=object)
+        indexes = np.empty(n, dtype=object)
+        empty_distances = np.empty(0)
+        empty_indexes = np.empty(0, dtype=np.int64)
+        for i in range(n):
+            distances[i] = empty_distances
+            indexes[i] = empty_indexes
+        
+        for rows, batch_lat, batch_lng in self._get_batches(lat, lng, 
+                                                            batch_size):
+            if len(rows) == 0:
+                continue
+            batch_indexes = self.tree.query_radius(
+                to_rad_np(np.column_stack([batch_lat, batch_lng])), 
+                r=radius/r
+            )
+            # Distances of all found pairs in one call
+            counts = np.array([len(x) for x in batch_indexes])
+            flat_indexes = np.concatenate(
+                list(batch_indexes) + [empty_indexes]
+            ).astype(np.int64)
+            flat_distances = hav_distance_np(
+                np.repeat(batch_lat, counts), np.repeat(batch_lng, counts),
+                self.lat[flat_indexes], self.lng[flat_indexes]
+            )
+            # Drop pairs out of radius because of rounding
+            # and sort by distance
+            bounds = np.cumsum(counts)[:-1]
+            for row, row_indexes, row_distances in zip(rows, 
+                np.split(flat_indexes, bounds), 
+                np.split(flat_distances, bounds)):
+                radius_mask = row_distances <= radius
+                order = np.argsort(row_distances[radius_mask])
+                indexes[row] = row_indexes[radius_mask][order]
+                distances[row] = row_distances[radius_mask][order]
+        return distances, indexes
+
+
+# CHUNKED GEO-FEATURE PIPELINE
+def get_geo_features(chunk:pd.DataFrame, distance_features:dict, 
+    bin_features:dict=None, keep_columns:list=None)->pd.DataFrame:
+    """Compute distance and binned features of the data chunk
+
+    Args:
+        chunk (pd.DataFrame): Data chunk
+        distance_features (dict): New column name - 
+            (lat_1, lng_1, lat_2, lng_2) column names for hav_distance_np
+        bin_features (dict, optional): New column name - 
+            (source column name, bins edges). Source column can be 
+            a distance feature. Labels are ordered ints, 
+            NaN for values out of edges. Defaults to None.
+        keep_columns (list, optional): Source columns to keep. 
+            Defaults to None - keep all.
+
+    Returns:
+        pd.DataFrame: Chunk with new features
+    """
+    if keep_columns is not None:
+        result = chunk[keep_columns].copy()
+    else:
+        result = chunk.copy()
+    
+    for name, (lat_1, lng_1, lat_2, lng_2) in distance_features.items():
+        result[name] = hav_distance_np(
+            chunk[lat_1].to_numpy(), chunk[lng_1].to_numpy(),
+            chunk[lat_2].to_numpy(), chunk[lng_2].to_numpy()
+        )
+    
+    for name, (column, bins) in (bin_features or {}).items():
+        source = result[column] if column in result else chunk[column]
+        result[name] = pd.cut(
+            source, bins=bins, labels=list(range(0, len(bins)-1)), 
+            include_lowest=True
+        ).astype('Int16')
+    return result
+
+
+def process_csv_by_chunks(input_path:str, output_path:str, 
+    distance_features:dict, bin_features:dict=None, 
+    keep_columns:list=None, chunksize:int=10**6, n_workers:int=None, 
+    read_csv_kwargs:dict=None)->int:
+    """Compute geo features of the large CSV chunk by chunk on the process 
+    pool and write them incrementally to the parquet file. 
+    At most 2*n_workers chunks are in memory at once.
+
+    Args:
+        input_path (str): Path of the input CSV
+        output_path (str): Path of the output parquet file
+        distance_features (dict): See get_geo_features
+        bin_features (dict, optional): See get_geo_features. 
+            Defaults to None.
+        keep_columns (list, optional): Source columns to keep. 
+            Defaults to None - keep all.
+        chunksize (int, optional): Number of rows in chunk. 
+            Defaults to 10**6.
+        n_workers (int, optional): Number of processes. If 1, chunks are 
+            processed in the current process. Defaults to None - 
+            number of CPUs.
+        read_csv_kwargs (dict, optional): Additional pd.read_csv arguments. 
+            Defaults to None.
+
+    Returns:
+        int: Number of written rows
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    
+    if n_workers is None:
+        n_workers = os.cpu_count()
+    reader = pd.read_csv(input_path, chunksize=chunksize, 
+                         **(read_csv_kwargs or {}))
+    feature_args = (distance_features, bin_features, keep_columns)
+    writer = None
+    rows = 0
+    
+    def write(features:pd.DataFrame):
+        nonlocal writer, rows
+        if writer is None:
+            table = pa.Table.from_pandas(features, preserve_index=False)
+            writer = pq.ParquetWriter(output_path, table.schema)
+        else:
+            # Cast chunk to the schema of the first chunk
+            table = pa.Table.from_pandas(features, schema=writer.schema, 
+                                         preserve_index=False)
+        writer.write_table(table)
+        rows += len(features)
     
+    try:
+        if n_workers == 1:
+            for chunk in reader:
+                write(get_geo_features(chunk, *feature_args))
+        else:
+            with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                futures = deque()
+                for chunk in reader:
+                    futures.append(executor.submit(
+                        get_geo_features, chunk, *feature_args
+                    ))
+                    # Write ready chunks in order to bound memory
+                    while len(futures) >= 2*n_workers \
+                        or (futures and futures[0].done()):
+                        write(futures.popleft().result())
+                while futures:
+                    write(futures.popleft().result())
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
@@ -0,0 +1,126 @@
+"""
+Startup benchmark of eda.py.
+
+Measures import time and RSS of eda.py in a fresh Python process
+and checks that plotting libraries (matplotlib, seaborn) are not loaded
+until the first plot. Results are saved in JSON for tracking regressions.
+
+Usage:
+    python startup_benchmark.py --output startup_results.json
+    python startup_benchmark.py --repeats 10 --max-import-seconds 1
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime
+
+import numpy as np
+
+# Code measured in the fresh process. Prints JSON record
+measured_code = """
+import json, sys, time
+import psutil
+
+def get_rss():
+    # Current RSS in bytes
+    return psutil.Process().memory_info().rss
+
+record = {'rss_start_bytes': get_rss()}
+start = time.perf_counter()
+import eda
+record['import_seconds'] = time.perf_counter() - start
+record['rss_import_bytes'] = get_rss()
+record['plotting_loaded'] = 'matplotlib' in sys.modules \\
+    or 'seaborn' in sys.modules
+
+if PLOT:
+    import matplotlib
+    matplotlib.use('Agg')
+    import pandas as pd
+    data = pd.DataFrame({'x': range(1000)})
+    start = time.perf_counter()
+    eda.box_hist_plot(data, 'x', 'Startup benchmark')
+    record['first_plot_seconds'] = time.perf_counter() - start
+    record['rss_plot_bytes'] = get_rss()
+print(json.dumps(record))
+"""
+
+def run_fresh_process(plot:bool=False) -> dict:
+    """Import eda.py in a fresh Python process
+
+    Args:
+        plot (bool): Plot the first figure after import. Defaults to False.
+
+    Returns:
+        dict: Record of the process
+    """
+    code = measured_code.replace('PLOT', str(plot))
+    output = subprocess.run(
+        [sys.executable, '-c', code], capture_output=True, text=True,
+        check=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def run_benchmark(repeats:int=5, verbose:bool=True) -> dict:
+    """Run startup benchmark. Median over repeats is reported
+
+    Args:
+        repeats (int): Number of fresh processes. Defaults to 5.
+        verbose (bool): Print records. Defaults to True.
+
+    Returns:
+        dict: Median import time, RSS and plotting_loaded flag
+    """
+    records = [run_fresh_process(plot=False) for _ in range(repeats)]
+    plot_record = run_fresh_process(plot=True)
+    if verbose:
+        for record in records + [plot_record]:
+            print(record)
+
+    import_seconds = [record['import_seconds'] for record in records]
+    rss_import = [record['rss_import_bytes'] - record['rss_start_bytes']
+                  for record in records]
+    return {
+        'import_seconds': float(np.median(import_seconds)),
+        'import_seconds_min': float(np.min(import_seconds)),
+        'import_rss_bytes': int(np.median(rss_import)),
+        'plotting_loaded_on_import': any(
+            record['plotting_loaded'] for record in records),
+        'first_plot_seconds': plot_record['first_plot_seconds'],
+        'plot_rss_bytes': plot_record['rss_plot_bytes']
+            - plot_record['rss_start_bytes'],
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark eda.py startup')
+    parser.add_argument('--output', default='startup_results.json',
+                        help='Path of JSON with results')
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--max-import-seconds', type=float, default=None,
+                        help='Exit with error if import is slower')
+    args = parser.parse_args()
+
+    result = run_benchmark(args.repeats)
+    report = {
+        'created': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'result': result,
+    }
+    with open(args.output, 'w') as json_file:
+        json.dump(report, json_file, indent=2)
+    print(result)
+    print(f'Results saved to {args.output}')
+
+    # Regression guards
+    if result['plotting_loaded_on_import']:
+        sys.exit('Plotting libraries are loaded on eda.py import')
+    if args.max_import_seconds is not None \
+        and result['import_seconds'] > args.max_import_seconds:
+        sys.exit(f"Import takes {result['import_seconds']:.3f} s")
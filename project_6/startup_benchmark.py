@@ -0,0 +1,147 @@
+"""
+Startup benchmark of utils.py.
+
+Measures import time and RSS of utils.py in a fresh Python process,
+checks which heavy libraries are loaded on import and, if the data folder
+exists, measures the first and the repeated get_data_keeper() calls.
+Results are saved in JSON for tracking regressions.
+
+Usage:
+    python startup_benchmark.py --output startup_results.json
+    python startup_benchmark.py --repeats 10 --max-import-seconds 1
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime
+
+import numpy as np
+
+# Libraries, that should not be loaded on utils.py import
+heavy_modules = ['matplotlib', 'seaborn', 'plotly', 'IPython',
+                 'mpl_toolkits.mplot3d', 'sklearn', 'cupy', 'cuml']
+
+# Code measured in the fresh process. Prints JSON record
+measured_code = """
+import json, os, sys, time
+import psutil
+
+def get_rss():
+    # Current RSS in bytes
+    return psutil.Process().memory_info().rss
+
+record = {'rss_start_bytes': get_rss()}
+start = time.perf_counter()
+import utils
+record['import_seconds'] = time.perf_counter() - start
+record['rss_import_bytes'] = get_rss()
+record['loaded_modules'] = [name for name in HEAVY_MODULES
+                            if name in sys.modules]
+
+if KEEPER and os.path.exists('data/images_paths.csv'):
+    start = time.perf_counter()
+    utils.get_data_keeper()
+    record['first_keeper_seconds'] = time.perf_counter() - start
+    start = time.perf_counter()
+    utils.get_data_keeper()
+    record['shared_keeper_seconds'] = time.perf_counter() - start
+    record['rss_keeper_bytes'] = get_rss()
+print(json.dumps(record))
+"""
+
+def run_fresh_process(keeper:bool=False, cwd:str=None) -> dict:
+    """Import utils.py in a fresh Python process
+
+    Args:
+        keeper (bool): Get shared DataKeeper after import.
+            Defaults to False.
+        cwd (str): Working directory with data folder.
+            Defaults to None - directory of utils.py.
+
+    Returns:
+        dict: Record of the process
+    """
+    module_dir = os.path.dirname(os.path.abspath(__file__))
+    code = measured_code.replace('KEEPER', str(keeper))\
+        .replace('HEAVY_MODULES', repr(heavy_modules))
+    env = dict(os.environ)
+    env['PYTHONPATH'] = module_dir + os.pathsep + env.get('PYTHONPATH', '')
+    output = subprocess.run(
+        [sys.executable, '-c', code], capture_output=True, text=True,
+        check=True, cwd=cwd or module_dir, env=env,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def run_benchmark(repeats:int=5, cwd:str=None, verbose:bool=True) -> dict:
+    """Run startup benchmark. Median over repeats is reported
+
+    Args:
+        repeats (int): Number of fresh processes. Defaults to 5.
+        cwd (str): Working directory with data folder.
+            Defaults to None - directory of utils.py.
+        verbose (bool): Print records. Defaults to True.
+
+    Returns:
+        dict: Median import time, RSS, loaded heavy modules
+            and DataKeeper times (if data exists)
+    """
+    records = [run_fresh_process(cwd=cwd) for _ in range(repeats)]
+    keeper_record = run_fresh_process(keeper=True, cwd=cwd)
+    if verbose:
+        for record in records + [keeper_record]:
+            print(record)
+
+    import_seconds = [record['import_seconds'] for record in records]
+    rss_import = [record['rss_import_bytes'] - record['rss_start_bytes']
+                  for record in records]
+    result = {
+        'import_seconds': float(np.median(import_seconds)),
+        'import_seconds_min': float(np.min(import_seconds)),
+        'import_rss_bytes': int(np.median(rss_import)),
+        'loaded_modules': sorted(set(
+            name for record in records for name in record['loaded_modules']
+        )),
+    }
+    if 'first_keeper_seconds' in keeper_record:
+        result['first_keeper_seconds'] = keeper_record['first_keeper_seconds']
+        result['shared_keeper_seconds'] = \
+            keeper_record['shared_keeper_seconds']
+        result['keeper_rss_bytes'] = keeper_record['rss_keeper_bytes'] \
+            - keeper_record['rss_start_bytes']
+    return result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark utils.py startup')
+    parser.add_argument('--output', default='startup_results.json',
+                        help='Path of JSON with results')
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--cwd', default=None,
+                        help='Working directory with data folder')
+    parser.add_argument('--max-import-seconds', type=float, default=None,
+                        help='Exit with error if import is slower')
+    args = parser.parse_args()
+
+    result = run_benchmark(args.repeats, cwd=args.cwd)
+    report = {
+        'created': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'result': result,
+    }
+    with open(args.output, 'w') as json_file:
+        json.dump(report, json_file, indent=2)
+    print(result)
+    print(f'Results saved to {args.output}')
+
+    # Regression guards
+    if result['loaded_modules']:
+        sys.exit(f"Heavy modules loaded on import: {result['loaded_modules']}")
+    if args.max_import_seconds is not None \
+        and result['import_seconds'] > args.max_import_seconds:
+        sys.exit(f"Import takes {result['import_seconds']:.3f} s")
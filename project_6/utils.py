@@ -1,39 +1,429 @@
 import pandas as pd
 import numpy as np
 
-# %matplotlib ipympl
-import matplotlib.pyplot as plt
-import matplotlib
-matplotlib.rcParams['figure.dpi'] = 300
-import seaborn as sns
-from mpl_toolkits.mplot3d import Axes3D
+import os
+import json
+import hashlib
+import warnings 
+import importlib
+from functools import lru_cache
 
-import plotly.graph_objs as go
-import plotly.express as px
-from plotly.subplots import make_subplots
+warnings.filterwarnings("ignore")
 
-import warnings 
+import pickle
+import inspect
 
-from IPython.display import display, HTML
+import time
 
-warnings.filterwarnings("ignore")
+# Heavy libraries (plotting, IPython, sklearn metrics) are imported 
+# on the first use. Name: (module, attribute or None for module)
+lazy_imports = {
+    'matplotlib': ('matplotlib', None),
+    'plt': ('matplotlib.pyplot', None),
+    'sns': ('seaborn', None),
+    'Axes3D': ('mpl_toolkits.mplot3d', 'Axes3D'),
+    'go': ('plotly.graph_objs', None),
+    'px': ('plotly.express', None),
+    'make_subplots': ('plotly.subplots', 'make_subplots'),
+    'display': ('IPython.display', 'display'),
+    'HTML': ('IPython.display', 'HTML'),
+    'calinski_harabasz_score': ('sklearn.metrics', 'calinski_harabasz_score'),
+    'davies_bouldin_score': ('sklearn.metrics', 'davies_bouldin_score'),
+}
 
-plt.rcParams["patch.force_edgecolor"] = True
+# Modules imported by lazy_import
+imported_modules = set()
 
-import pickle
+def lazy_import(name:str):
+    """Import object from lazy_imports. On the first pyplot import 
+    set up figure parameters
 
-import cupy as cp
+    Args:
+        name (str): Name in lazy_imports
 
-from cuml import UMAP, TSNE
-from cuml.decomposition import PCA
-from cuml.preprocessing import StandardScaler, MinMaxScaler
-from cuml.cluster import KMeans, AgglomerativeClustering, DBSCAN, HDBSCAN
-from cuml.model_selection import GridSearchCV
+    Returns:
+        object: Module or its attribute
+    """
+    module_name, attribute = lazy_imports[name]
+    module = importlib.import_module(module_name)
+    if module_name not in imported_modules:
+        imported_modules.add(module_name)
+        if module_name == 'matplotlib.pyplot':
+            # %matplotlib ipympl
+            module.rcParams['figure.dpi'] = 300
+            module.rcParams["patch.force_edgecolor"] = True
+    if attribute is None:
+        return module
+    return getattr(module, attribute)
 
-from sklearn.metrics import calinski_harabasz_score, davies_bouldin_score
 
-import time
+# BACKEND
+# Names of the backend classes, available as module attributes
+backend_class_names = [
+    'PCA', 'IncrementalPCA', 'StandardScaler', 'MinMaxScaler', 
+    'KMeans', 'AgglomerativeClustering', 'DBSCAN', 'HDBSCAN', 
+    'UMAP', 'TSNE',
+]
+
+def is_gpu_available() -> bool:
+    """Check if cupy, cuml and GPU device are available
+
+    Returns:
+        bool: True if GPU backend can be used
+    """
+    try:
+        import cupy as cp
+        import cuml
+        return cp.cuda.runtime.getDeviceCount() > 0
+    except Exception:
+        return False
+
+
+class Backend():
+    def __init__(self, name:str='auto', n_jobs:int=-1):
+        """Array and ML backend: 
+        - 'gpu' - cupy arrays and cuml models;
+        - 'cpu' - numpy arrays and scikit-learn models 
+            (UMAP from umap-learn), parallel on all cores.
+
+        Args:
+            name (str): 'cpu', 'gpu' or 'auto' - 'gpu' if available. 
+                Defaults to 'auto'.
+            n_jobs (int): Number of CPU jobs for models with n_jobs 
+                parameter. Defaults to -1 (all cores).
+
+        Raises:
+            ValueError: If name is not in ["auto", "cpu", "gpu"]
+        """
+        name = name.strip().lower()
+        if name == 'auto':
+            name = 'gpu' if is_gpu_available() else 'cpu'
+        self.name = name
+        self.n_jobs = n_jobs
+        
+        if name == 'gpu':
+            import cupy as cp
+            from cuml import UMAP, TSNE
+            from cuml.decomposition import PCA, IncrementalPCA
+            from cuml.preprocessing import StandardScaler, MinMaxScaler
+            from cuml.cluster import KMeans, AgglomerativeClustering, \
+                DBSCAN, HDBSCAN
+            self.xp = cp
+            self.dtype = 'cupy'
+        elif name == 'cpu':
+            from sklearn.decomposition import PCA, IncrementalPCA
+            from sklearn.preprocessing import StandardScaler, MinMaxScaler
+            from sklearn.cluster import KMeans, AgglomerativeClustering, \
+                DBSCAN, HDBSCAN
+            from sklearn.manifold import TSNE
+            try:
+                from umap import UMAP
+            except ImportError:
+                UMAP = None
+            self.xp = np
+            self.dtype = 'numpy'
+        else:
+            raise ValueError(
+                'Wrong backend. Only "auto", "cpu" and "gpu" allowed'
+            )
+        
+        self.PCA = PCA
+        self.IncrementalPCA = IncrementalPCA
+        self.StandardScaler = StandardScaler
+        self.MinMaxScaler = MinMaxScaler
+        self.KMeans = KMeans
+        self.AgglomerativeClustering = AgglomerativeClustering
+        self.DBSCAN = DBSCAN
+        self.HDBSCAN = HDBSCAN
+        self.UMAP = UMAP
+        self.TSNE = TSNE
+    
+    
+    def __repr__(self):
+        return f'Backend({self.name!r})'
+    
+    
+    def get_class(self, model_class):
+        """Get backend class by name or return the class itself
+
+        Args:
+            model_class (str or type): Class name (e.g. 'KMeans') or class
+
+        Raises:
+            ImportError: If UMAP is used on CPU without umap-learn
+
+        Returns:
+            type: Model class
+        """
+        if not isinstance(model_class, str):
+            return model_class
+        if model_class not in backend_class_names:
+            raise ValueError(f'Unknown model class "{model_class}"')
+        result = getattr(self, model_class)
+        if result is None:
+            raise ImportError(
+                f'{model_class} on CPU requires the umap-learn package'
+            )
+        return result
+    
+    
+    def make_model(self, model_class, params:dict=None):
+        """Init model of the backend class with params. 
+        Numpy scalars from params grid are converted to python, 
+        integral floats - to int, if the parameter default is not float 
+        (mesh of int and float params is float). 
+        On CPU n_jobs is set if it is the class parameter.
+
+        Args:
+            model_class (str or type): Class name or class
+            params (dict, optional): Model parameters. Defaults to None.
+
+        Returns:
+            object: Model
+        """
+        model_class = self.get_class(model_class)
+        signature = inspect.signature(model_class).parameters
+        model_params = {}
+        for key, value in (params or {}).items():
+            if isinstance(value, np.generic):
+                value = value.item()
+            default = signature[key].default if key in signature else None
+            if isinstance(value, float) and value.is_integer() \
+                and not isinstance(default, float):
+                value = int(value)
+            model_params[key] = value
+        if self.name == 'cpu' and 'n_jobs' in signature \
+            and 'n_jobs' not in model_params:
+            model_params['n_jobs'] = self.n_jobs
+        return model_class(**model_params)
+    
+    
+    def asarray(self, data):
+        """Move data to the backend device
+
+        Args:
+            data (array-like): Data
+
+        Returns:
+            numpy.ndarray or cupy.ndarray: Backend array
+        """
+        return self.xp.asarray(data)
+    
+    
+    def to_numpy(self, data) -> np.ndarray:
+        """Move data from the backend device to RAM (numpy)
+
+        Args:
+            data (array-like): Backend array
+
+        Returns:
+            np.ndarray: Data in RAM
+        """
+        if hasattr(data, 'get'):
+            return data.get()
+        return np.asarray(data)
+    
+    
+    def free_memory(self):
+        """Free unused blocks of the device memory pool
+        """
+        if self.name == 'gpu':
+            self.xp.get_default_memory_pool().free_all_blocks()
+
+
+# Backends by name, created on the first request
+backends = {}
+
+def get_backend(backend='auto') -> Backend:
+    """Get shared backend by name
+
+    Args:
+        backend (str or Backend): 'auto', 'cpu', 'gpu' or Backend object. 
+            Defaults to 'auto'.
+
+    Returns:
+        Backend: Backend object
+    """
+    if isinstance(backend, Backend):
+        return backend
+    name = backend.strip().lower()
+    if name not in backends:
+        backends[name] = Backend(name)
+    return backends[name]
+
+
+def __getattr__(name:str):
+    """Get backend classes (KMeans, PCA...) of the default backend 
+    and lazy imported libraries (plt, sns...) as module attributes"""
+    if name in backend_class_names:
+        return getattr(get_backend(), name)
+    if name in lazy_imports:
+        return lazy_import(name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+
+# DATA
+@lru_cache(maxsize=None)
+def _read_image_paths(path:str, modified_time:float) -> pd.DataFrame:
+    return pd.read_csv(path)
+
+
+def read_image_paths(path:str) -> pd.DataFrame:
+    """Read "image_paths" dataset once. The table is cached 
+    until the file is modified
+
+    Args:
+        path (str): Path to "image_paths" dataset
+
+    Returns:
+        pd.DataFrame: Image paths (shared, do not modify in place)
+    """
+    return _read_image_paths(os.path.abspath(path), os.path.getmtime(path))
+
+
+# DESCRIPTOR STORE
+# Size of chunk of descriptor reading and converting (bytes)
+store_chunk_size = 2**24
+
+def get_chunk_rows(descriptor:np.ndarray, chunk_size:int) -> int:
+    """Get number of descriptor rows in the chunk of chunk_size bytes"""
+    row_size = descriptor.dtype.itemsize * int(np.prod(descriptor.shape[1:]))
+    return max(1, chunk_size // max(row_size, 1))
+
 
+def convert_descriptor(
+    name:str,
+    descriptor_folder:str='data/descriptors/',
+    storage_dtype:str='float32',
+    chunk_size:int=store_chunk_size,
+) -> str:
+    """Convert pickled descriptor {name}.pickle to memory-mapped 
+    {name}.npy file (header with shape and dtype, then rows). 
+    DataLoader reads .npy descriptors instead of pickles, if they exist.
+
+    Args:
+        name (str): Name of the descriptor
+        descriptor_folder (str, optional): Folder where descriptors kept. 
+            Defaults to 'data/descriptors/'.
+        storage_dtype (str, optional): Stored dtype: 'float16', 'float32' 
+            or None - as in pickle. Defaults to 'float32'.
+        chunk_size (int, optional): Size of writing chunk in bytes. 
+            Defaults to store_chunk_size.
+
+    Returns:
+        str: Path of the .npy file
+    """
+    with open(descriptor_folder + name + '.pickle', 'rb') as pkl_file:
+        descriptor = np.asarray(pickle.load(pkl_file))
+    path = descriptor_folder + name + '.npy'
+    # Write to temporary file to keep the old one until the end
+    temp_path = path + '.tmp'
+    stored = np.lib.format.open_memmap(
+        temp_path, mode='w+', 
+        dtype=storage_dtype or descriptor.dtype, shape=descriptor.shape,
+    )
+    chunk_rows = get_chunk_rows(descriptor, chunk_size)
+    for start in range(0, descriptor.shape[0], chunk_rows):
+        stored[start:start+chunk_rows] = descriptor[start:start+chunk_rows]
+    stored.flush()
+    del stored
+    os.replace(temp_path, path)
+    return path
+
+
+def iter_rows(
+    descriptor:np.ndarray,
+    indexes:np.ndarray=None,
+    chunk_rows:int=None,
+    chunk_size:int=store_chunk_size,
+):
+    """Iterate over chunks of rows of memory-mapped descriptor. 
+    float16 rows are converted to float32.
+
+    Args:
+        descriptor (np.ndarray): Memory-mapped descriptor
+        indexes (np.ndarray, optional): Sorted row indexes. 
+            Defaults to None - all rows.
+        chunk_rows (int, optional): Rows in chunk. 
+            Defaults to None - by chunk_size.
+        chunk_size (int, optional): Size of chunk in bytes. 
+            Defaults to store_chunk_size.
+
+    Yields:
+        tuple: (position of the first chunk row, rows in RAM)
+    """
+    dtype = descriptor.dtype
+    if dtype == np.float16:
+        dtype = np.dtype(np.float32)
+    row_cnt = descriptor.shape[0] if indexes is None else len(indexes)
+    if chunk_rows is None:
+        chunk_rows = get_chunk_rows(descriptor, chunk_size)
+    for start in range(0, row_cnt, chunk_rows):
+        if indexes is None:
+            rows = descriptor[start:start+chunk_rows]
+        else:
+            rows = descriptor[indexes[start:start+chunk_rows]]
+        yield start, np.asarray(rows, dtype=dtype)
+
+
+def read_rows(
+    descriptor:np.ndarray,
+    indexes:np.ndarray=None,
+    chunk_size:int=store_chunk_size,
+) -> np.ndarray:
+    """Read rows of memory-mapped descriptor by sorted chunks 
+    into preallocated array. float16 rows are converted to float32.
+
+    Args:
+        descriptor (np.ndarray): Memory-mapped descriptor
+        indexes (np.ndarray, optional): Sorted row indexes. 
+            Defaults to None - all rows.
+        chunk_size (int, optional): Size of reading chunk in bytes. 
+            Defaults to store_chunk_size.
+
+    Returns:
+        np.ndarray: Rows in RAM
+    """
+    dtype = descriptor.dtype
+    if dtype == np.float16:
+        dtype = np.dtype(np.float32)
+    row_cnt = descriptor.shape[0] if indexes is None else len(indexes)
+    result = np.empty((row_cnt,) + descriptor.shape[1:], dtype=dtype)
+    for start, rows in iter_rows(descriptor, indexes, chunk_size=chunk_size):
+        result[start:start+len(rows)] = rows
+    return result
+
+
+def get_sample_indexes(
+    total_row_cnt:int,
+    data_fraction:float,
+    random_state:int=None,
+) -> np.ndarray:
+    """Get sorted indexes of the random descriptor rows
+
+    Args:
+        total_row_cnt (int): Number of descriptor rows
+        data_fraction (float): Fraction of rows
+        random_state (int, optional): Set random state for the random 
+            generator. Defaults to None.
+
+    Returns:
+        np.ndarray: Sorted row indexes
+    """
+    # Get required row count
+    row_cnt = np.ceil(
+        data_fraction * total_row_cnt
+    ).astype(int)
+    
+    rng = np.random.default_rng(random_state)
+    indexes = rng.choice(
+        total_row_cnt, 
+        size=row_cnt,
+        replace=False
+    )
+    indexes.sort()
+    return indexes
 
 
 class DataLoader():
@@ -45,6 +435,7 @@ class DataLoader():
         descriptor_folder = 'data/descriptors/',
         image_paths = 'data/images_paths.csv',
         verbose:bool = True,
+        backend = 'auto',
     ):
         """Class for data loading (descriprots and image_paths)
 
@@ -56,11 +447,14 @@ class DataLoader():
             image_paths (str, optional): Path to "image_paths" dataset. 
                 Defaults to 'data/images_paths.csv'.
             verbose (bool): Print additional messages. Defaults to True
+            backend (str or Backend): Array and ML backend 
+                ('auto', 'cpu', 'gpu'). Defaults to 'auto'.
             
         """
+        self.backend = get_backend(backend)
         self._descriptor_folder = descriptor_folder
         self.descriptor_names = descriptor_names
-        self.full_image_paths = pd.read_csv(image_paths)
+        self.full_image_paths = read_image_paths(image_paths)
         self._descriptor = None
         self._descriptor_name = None
         self._image_paths = None
@@ -68,58 +462,99 @@ class DataLoader():
         if self.verbose:
             # Show image paths details
             print('Shape of "image paths":', self.full_image_paths.shape)
-            display(self.full_image_paths.head())
+            lazy_import('display')(self.full_image_paths.head())
     
     def __del__(self):
         del self._descriptor
     
-    def _load_full_descriptor(self, name:str, dtype:str='cupy'):
-        """Load descriptor with stated "name" in RAM or GPU (see "dtype")
+    def _get_descriptor_path(self, name:str, extension:str) -> str:
+        return self._descriptor_folder + name + extension
+    
+    
+    def _is_stored(self, name:str) -> bool:
+        """Check if descriptor is converted to memory-mapped .npy file
+        """
+        return os.path.exists(self._get_descriptor_path(name, '.npy'))
+    
+    
+    def _set_descriptor(self, name:str, descriptor, dtype:str=None):
+        """Set active descriptor in RAM or GPU (see "dtype")
+
+        Args:
+            name (str): Name of the descriptor
+            descriptor (np.ndarray): Descriptor in RAM
+            dtype (str): Select type of data:
+            - 'numpy' - numpy.ndarray format (keep data on RAM);
+            - 'cupy' - cupy.ndarray format (keep data on GPU).
+            Defaults to None - format of the backend.
+
+        Raises:
+            TypeError: If data type is not in ["numpy", "cupy"]
+        """
+        self._descriptor = descriptor
+        self._descriptor_name = name
+        if dtype is None:
+            dtype = self.backend.dtype
+        if dtype.strip().lower() == 'numpy':
+            pass
+        elif dtype.strip().lower() == 'cupy':
+            self._descriptor = get_backend('gpu').asarray(
+                self._descriptor
+            )
+        else:
+            raise TypeError(
+                'Wrong data_type. Only "numpy" and "cupy" allowed'
+            )
+    
+    
+    def _load_full_descriptor(self, name:str, dtype:str=None):
+        """Load descriptor with stated "name" in RAM or GPU (see "dtype"). 
+        Memory-mapped .npy file is read, if it exists, else pickle.
 
         Args:
             name (str): Name of the descriptor to load
             dtype (str): Select type of data:
             - 'numpy' - numpy.ndarray format (keep data on RAM);
             - 'cupy' - cupy.ndarray format (keep data on GPU).
-            Defaults to 'cupy'.
+            Defaults to None - format of the backend.
 
         Raises:
             TypeError: If data type is not in ["numpy", "cupy"]
         """
-        with open(
-            self._descriptor_folder + name + '.pickle',
-            'rb' # read binary
-        ) as pkl_file:
-            self._descriptor = pickle.load(pkl_file)
-            self._descriptor_name = name
-            if dtype.strip().lower() == 'numpy':
-                pass
-            elif dtype.strip().lower() == 'cupy':
-                self._descriptor = cp.asarray(self._descriptor)
-            else:
-                raise TypeError(
-                    'Wrong data_type. Only "numpy" and "cupy" allowed'
-                )
+        self._descriptor = None # Free space of the previous descriptor
+        if self._is_stored(name):
+            descriptor = read_rows(np.load(
+                self._get_descriptor_path(name, '.npy'), mmap_mode='r'
+            ))
+        else:
+            with open(
+                self._get_descriptor_path(name, '.pickle'),
+                'rb' # read binary
+            ) as pkl_file:
+                descriptor = pickle.load(pkl_file)
+        self._set_descriptor(name, descriptor, dtype)
         self._image_paths = self.full_image_paths
     
     
     def load_descriptor(
         self, 
         name:str,
-        dtype:str='cupy',
+        dtype:str=None,
         data_fraction:float=1.0,
         random_state:int=None,
     ):
         """Load random part of the descriptor with stated "name" in RAM 
         or GPU (see "dtype") and with setted fraction. 
-        If data_fraction==1.0, load full descriptor.
+        If data_fraction==1.0, load full descriptor. 
+        If descriptor is converted to .npy (see convert_descriptor), 
+        only sampled rows are read from the memory-mapped file.
 
         Args:
             name (str): Name of the descriptor to load
             dtype (str): Select type of data:
             - 'numpy' - numpy.ndarray format (keep data on RAM);
             - 'cupy' - cupy.ndarray format (keep data on GPU).
-            Defaults to 'cupy'.
+            Defaults to None - format of the backend.
             data_fraction (float): Fraction of the descriptor to load. 
                 Defaults to 1.0.
             random_state (int, optional): Set random state for the random 
@@ -131,31 +566,74 @@ class DataLoader():
         if data_fraction < 0.0 or data_fraction > 1.0:
             raise ValueError('data_fraction must be in the range [0, 1]')
         
-        self._load_full_descriptor(name, dtype)
+        if data_fraction == 1.0 or not self._is_stored(name):
+            self._load_full_descriptor(name, dtype)
         
         if data_fraction == 1.0:
             if self.verbose:
                 print('All dataset downloaded')
             return
         
-        # Get required row count
-        row_cnt = np.ceil(
-            data_fraction * self._descriptor.shape[0]
-        ).astype(int)
+        if self._is_stored(name):
+            descriptor = np.load(
+                self._get_descriptor_path(name, '.npy'), mmap_mode='r'
+            )
+        else:
+            descriptor = self._descriptor
         
-        rng = np.random.default_rng(random_state)
-        indexes = rng.choice(
-            self._descriptor.shape[0], 
-            size=row_cnt,
-            replace=False
+        indexes = get_sample_indexes(
+            descriptor.shape[0], data_fraction, random_state
         )
-        indexes.sort()
         
         # Save active descriptor and related image paths
-        self._descriptor = self._descriptor[indexes,:]
-        self._image_paths = self.image_paths.iloc[indexes,:]
+        if self._is_stored(name):
+            self._descriptor = None
+            self._set_descriptor(name, read_rows(descriptor, indexes), dtype)
+        else:
+            self._descriptor = self._descriptor[indexes,:]
+        self._image_paths = self.full_image_paths.iloc[indexes,:]
         
     
+    def get_descriptor_fingerprint(self, name:str) -> dict:
+        """Get fingerprint of the descriptor file (path, size and 
+        modification time) for cache keys
+        """
+        extension = '.npy' if self._is_stored(name) else '.pickle'
+        path = self._get_descriptor_path(name, extension)
+        stat = os.stat(path)
+        return {
+            'path': os.path.abspath(path),
+            'size': stat.st_size,
+            'modified': stat.st_mtime_ns,
+        }
+    
+    
+    def select_image_paths(
+        self,
+        name:str,
+        data_fraction:float=1.0,
+        random_state:int=None,
+    ):
+        """Set active descriptor name and image paths as load_descriptor 
+        does, but without descriptor loading (e.g. if its PCA is cached)
+
+        Args:
+            name (str): Name of the descriptor
+            data_fraction (float): Fraction of the descriptor. 
+                Defaults to 1.0.
+            random_state (int, optional): Set random state for the random 
+                generator. Defaults to None.
+        """
+        self._descriptor = None
+        self._descriptor_name = name
+        self._image_paths = self.full_image_paths
+        if data_fraction < 1.0:
+            indexes = get_sample_indexes(
+                self.full_image_paths.shape[0], data_fraction, random_state
+            )
+            self._image_paths = self.full_image_paths.iloc[indexes,:]
+    
+    
     @property
     def descriptor(self):
         """Return active descriptor and its name
@@ -180,6 +658,128 @@ class DataLoader():
 
 
 
+# CACHE
+class ArrayCache():
+    def __init__(
+        self,
+        cache_dir:str='data/cache/',
+        max_size:int=4*2**30,
+        verbose:bool=False,
+    ):
+        """Content-addressed on-disk cache of numpy arrays (.npy files). 
+        File name is sha256 of the key parameters. Least recently used 
+        files are deleted, when total size is more than max_size.
+
+        Args:
+            cache_dir (str, optional): Folder of cached files. 
+                Defaults to 'data/cache/'.
+            max_size (int, optional): Size budget in bytes. 
+                Defaults to 4*2**30 (4 GB).
+            verbose (bool, optional): Print hits and misses. 
+                Defaults to False.
+        """
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.verbose = verbose
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+    
+    
+    def get_key(self, **params) -> str:
+        """Get key of the cached array by its parameters
+
+        Returns:
+            str: sha256 hex digest
+        """
+        content = json.dumps(params, sort_keys=True, default=str)
+        return hashlib.sha256(content.encode()).hexdigest()
+    
+    
+    def _get_path(self, key:str) -> str:
+        return os.path.join(self.cache_dir, key + '.npy')
+    
+    
+    def load(self, key:str) -> np.ndarray:
+        """Load cached array
+
+        Args:
+            key (str): Key of the array
+
+        Returns:
+            np.ndarray: Array or None, if it is not cached
+        """
+        path = self._get_path(key)
+        try:
+            result = np.load(path)
+        except (FileNotFoundError, ValueError, OSError):
+            self.misses += 1
+            if self.verbose:
+                print(f'Cache miss: {key[:12]}')
+            return None
+        os.utime(path) # Mark as recently used
+        self.hits += 1
+        if self.verbose:
+            print(f'Cache hit: {key[:12]}')
+        return result
+    
+    
+    def save(self, key:str, array:np.ndarray):
+        """Save array and evict least recently used arrays over max_size
+
+        Args:
+            key (str): Key of the array
+            array (np.ndarray): Array in RAM
+        """
+        path = self._get_path(key)
+        # Write to temporary file, so partly written array is never read
+        temp_path = path + '.tmp.npy'
+        np.save(temp_path, array)
+        os.replace(temp_path, path)
+        self._evict()
+    
+    
+    def _evict(self):
+        """Delete least recently used files over max_size"""
+        files = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith('.npy') and '.tmp' not in entry.name:
+                stat = entry.stat()
+                files.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        files.sort()
+        total_size = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if total_size <= self.max_size:
+                break
+            os.remove(path)
+            total_size -= size
+    
+    
+    def clear(self):
+        """Delete all cached files"""
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith('.npy'):
+                os.remove(entry.path)
+    
+    
+    def info(self) -> dict:
+        """Get cache statistics
+
+        Returns:
+            dict: hits, misses, files and size in bytes
+        """
+        sizes = [entry.stat().st_size 
+                 for entry in os.scandir(self.cache_dir) 
+                 if entry.name.endswith('.npy')]
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'files': len(sizes),
+            'size': sum(sizes),
+        }
+
+
+
 class DataKeeper():
     def __init__(
         self,
@@ -190,9 +790,28 @@ class DataKeeper():
             "vdc_type": 150,
         },
         loader_verbose = False,
+        backend = 'auto',
+        cache:ArrayCache = None,
+        pca_batch_size:int = None,
+        pca_check_rows:int = 10000,
+        pca_tolerance:float = 0.01,
     ):
         """DataKeeper keeps active PCA-reduced descriptor 
-        and its Standard- and Norm- scaled version
+        and its Standard- and Norm- scaled version.
+        With cache, PCA-reduced and scaled descriptors are loaded from disk, 
+        if they were computed with the same descriptor file, data_fraction, 
+        random_state, n_components and backend (then pca and scalers 
+        are None). Sampling with random_state=None is not cached.
+        With pca_batch_size, PCA is fitted incrementally on row batches 
+        streamed from the memory-mapped descriptor (see convert_descriptor) 
+        and the descriptor is transformed by batches into preallocated 
+        array, so peak memory is bounded by pca_batch_size * n_features 
+        besides the result and the check rows. Incremental PCA explains 
+        less variance than the full PCA. The gap depends on the data 
+        (up to several percent for flat spectrum), so it is checked 
+        against the full PCA on pca_check_rows random rows (see 
+        pca_variance_gap) and the gap is printed, if it is more than 
+        pca_tolerance.
 
         Args:
             n_components_dict (dict): Number of PCA-components 
@@ -204,9 +823,24 @@ class DataKeeper():
                 }.
             loader_verbose (bool): Print additional information. 
                 Defaults to False.
+            backend (str or Backend): Array and ML backend 
+                ('auto', 'cpu', 'gpu'). Defaults to 'auto'.
+            cache (ArrayCache): On-disk cache of PCA-reduced and scaled 
+                descriptors. Defaults to None - no caching.
+            pca_batch_size (int): Rows in batch of incremental PCA. 
+                Defaults to None - full PCA of the loaded descriptor.
+            pca_check_rows (int): Rows to check incremental PCA against 
+                the full PCA. Defaults to 10000. None or 0 - no check.
+            pca_tolerance (float): Relative gap of explained variance 
+                of incremental PCA to report. Defaults to 0.01.
         """
-        self.loader = DataLoader(verbose=loader_verbose)
+        self.loader = DataLoader(verbose=loader_verbose, backend=backend)
+        self.backend = self.loader.backend
         self.n_components_dict = n_components_dict
+        self.cache = cache
+        self.pca_batch_size = pca_batch_size
+        self.pca_check_rows = pca_check_rows
+        self.pca_tolerance = pca_tolerance
         
         self.del_data() # Prepare empty data variables
     
@@ -216,7 +850,13 @@ class DataKeeper():
         """
         # descriptor_PCA
         self.descriptor_PCA = None
-        self.pca:PCA = None
+        self.pca = None
+        self.explained_variance_ratio = None
+        # Relative gap of explained variance of incremental PCA 
+        # to the full PCA on the check rows
+        self.pca_variance_gap = None
+        # Cache key parameters of the active descriptor_PCA
+        self.cache_params = None
     
     
     def del_data(self):
@@ -244,7 +884,7 @@ class DataKeeper():
         Args:
             random_state (int): Random state for the PCA. Defaults to None.
         """
-        self.pca = PCA(
+        self.pca = self.backend.PCA(
             n_components=self.n_components_dict[
                 self.loader._descriptor_name
             ], 
@@ -253,10 +893,142 @@ class DataKeeper():
         self.descriptor_PCA = self.pca.fit_transform(
             self.loader._descriptor
         )
+        self.explained_variance_ratio = float(
+            self.pca.explained_variance_ratio_.sum()
+        )
         # Free space of the original desciptor
         self.loader._descriptor = None
+    
+    
+    def get_incremental_PCA_descriptor(
+        self,
+        name:str,
+        data_fraction:float=1.0,
+        random_state:int=None,
+    ):
+        """Get descriptor with reduced features by incremental PCA. 
+        PCA is fitted on batches of pca_batch_size rows streamed from 
+        the memory-mapped descriptor, then batches are transformed 
+        into preallocated array. The descriptor is not loaded. 
+        The last batch with less than n_components rows is fitted 
+        together with the previous batch. The fitted PCA is checked 
+        by check_incremental_PCA.
+
+        Args:
+            name (str): Name of the descriptor
+            data_fraction (float): Fraction of the descriptor.
+                Defaults to 1.0.
+            random_state (int, optional): Set random state for the random 
+                generator. Defaults to None.
+
+        Raises:
+            ValueError: If descriptor is not converted to .npy
+        """
+        if not self.loader._is_stored(name):
+            raise ValueError(
+                f'Incremental PCA requires memory-mapped descriptor. '
+                f'Convert it by convert_descriptor("{name}")'
+            )
+        descriptor = np.load(
+            self.loader._get_descriptor_path(name, '.npy'), mmap_mode='r'
+        )
+        indexes = None
+        if data_fraction < 1.0:
+            indexes = get_sample_indexes(
+                descriptor.shape[0], data_fraction, random_state
+            )
+        n_components = self.n_components_dict[name]
+        batch_size = max(self.pca_batch_size, n_components)
+        self.pca = self.backend.IncrementalPCA(
+            n_components=n_components, 
+            batch_size=batch_size,
+        )
+        
+        # Fit by batches
+        batch = None
+        for _, rows in iter_rows(descriptor, indexes, batch_size):
+            if batch is not None and len(rows) < n_components:
+                # Last batch is too small for partial_fit
+                batch = np.concatenate([batch, rows])
+                continue
+            if batch is not None:
+                self.pca.partial_fit(self.backend.asarray(batch))
+            batch = rows
+        self.pca.partial_fit(self.backend.asarray(batch))
+        batch = None
+        self.explained_variance_ratio = float(
+            self.pca.explained_variance_ratio_.sum()
+        )
+        self.check_incremental_PCA(descriptor, indexes, random_state)
+        
+        # Transform by batches into preallocated array
+        row_cnt = descriptor.shape[0] if indexes is None else len(indexes)
+        dtype = descriptor.dtype
+        if dtype == np.float16:
+            dtype = np.dtype(np.float32)
+        self.descriptor_PCA = self.backend.xp.empty(
+            (row_cnt, n_components), dtype=dtype
+        )
+        for start, rows in iter_rows(descriptor, indexes, batch_size):
+            self.descriptor_PCA[start:start+len(rows)] = \
+                self.pca.transform(self.backend.asarray(rows))
+        self.loader.select_image_paths(name, data_fraction, random_state)
         
     
+    def check_incremental_PCA(
+        self,
+        descriptor:np.ndarray,
+        indexes:np.ndarray=None,
+        random_state:int=None,
+    ):
+        """Compare explained variance of incremental PCA with the full 
+        PCA fitted on pca_check_rows random rows of the descriptor. 
+        Relative gap is kept in pca_variance_gap and printed, 
+        if it is more than pca_tolerance. Full PCA fits the check rows 
+        better than the whole descriptor, so for the part of rows 
+        the gap is slightly overestimated.
+
+        Args:
+            descriptor (np.ndarray): Memory-mapped descriptor
+            indexes (np.ndarray, optional): Sorted row indexes of 
+                the descriptor sample. Defaults to None - all rows.
+            random_state (int, optional): Set random state for the random 
+                generator. Defaults to None.
+        """
+        if not self.pca_check_rows:
+            return
+        row_cnt = descriptor.shape[0] if indexes is None else len(indexes)
+        check_indexes = None
+        if row_cnt > self.pca_check_rows:
+            check_indexes = get_sample_indexes(
+                row_cnt, self.pca_check_rows / row_cnt, random_state
+            )
+            if indexes is not None:
+                check_indexes = indexes[check_indexes]
+        elif indexes is not None:
+            check_indexes = indexes
+        X = self.backend.asarray(read_rows(descriptor, check_indexes))
+        
+        # Variance of the check rows explained by both PCA
+        full_pca = self.backend.PCA(n_components=self.pca.n_components)
+        full_ratio = float(full_pca.fit(X).explained_variance_ratio_.sum())
+        total_variance = float(X.var(axis=0, ddof=1).sum())
+        incremental_ratio = float(
+            self.pca.transform(X).var(axis=0, ddof=1).sum()
+        ) / total_variance
+        check_row_cnt = X.shape[0]
+        X = None
+        self.pca_variance_gap = (full_ratio - incremental_ratio) / full_ratio
+        if self.pca_variance_gap > self.pca_tolerance:
+            print(
+                f'Incremental PCA explains {incremental_ratio:.4f} of '
+                f'variance vs {full_ratio:.4f} of full PCA on '
+                f'{check_row_cnt} rows '
+                f'(gap {self.pca_variance_gap:.2%}). '
+                f'Increase pca_batch_size or use full PCA'
+            )
+    
+    
     def load_descriptor_PCA(
         self, 
         name:str,
@@ -272,62 +1044,434 @@ class DataKeeper():
             random_state (int, optional): Set random state for the random 
                 generator and PCA. Defaults to None.
         """
-        self.loader.load_descriptor(
-            name, 
-            data_fraction=data_fraction, 
-            random_state=random_state
+        self.cache_params = None
+        if self.cache is not None \
+            and (random_state is not None or data_fraction == 1.0):
+            self.cache_params = {
+                'descriptor': self.loader.get_descriptor_fingerprint(name),
+                'data_fraction': data_fraction,
+                'random_state': random_state,
+                'n_components': self.n_components_dict[name],
+                'backend': self.backend.name,
+            }
+            if self.pca_batch_size:
+                self.cache_params['pca_batch_size'] = self.pca_batch_size
+            descriptor_PCA = self._load_cached('PCA')
+            if descriptor_PCA is not None:
+                self.loader.select_image_paths(
+                    name, data_fraction, random_state
+                )
+                self.pca = None
+                self.descriptor_PCA = descriptor_PCA
+                return
+        
+        if self.pca_batch_size:
+            self.get_incremental_PCA_descriptor(
+                name, data_fraction, random_state
+            )
+        else:
+            self.loader.load_descriptor(
+                name, 
+                data_fraction=data_fraction, 
+                random_state=random_state
+            )
+            self.get_PCA_descriptor(random_state=random_state)
+        self._save_cached('PCA', self.descriptor_PCA)
+    
+    
+    def _load_cached(self, kind:str):
+        """Load cached array of the active descriptor to the backend
+
+        Args:
+            kind (str): 'PCA', 'std' or 'norm'
+
+        Returns:
+            Backend array or None, if it is not cached
+        """
+        if self.cache_params is None:
+            return None
+        result = self.cache.load(
+            self.cache.get_key(kind=kind, **self.cache_params)
         )
-        self.get_PCA_descriptor(random_state=random_state)
- 
-   
+        if result is None:
+            return None
+        return self.backend.asarray(result)
+    
+    
+    def _save_cached(self, kind:str, data):
+        """Save array of the active descriptor to the cache
+
+        Args:
+            kind (str): 'PCA', 'std' or 'norm'
+            data: Backend array
+        """
+        if self.cache_params is None:
+            return
+        self.cache.save(
+            self.cache.get_key(kind=kind, **self.cache_params),
+            self.backend.to_numpy(data)
+        )
+    
+    
     def get_std_scaled_descriptor(self):
         """Get Standard scaled data
         """
-        self.std_scaler = StandardScaler()
-        self.descriptors_scaled['std'] = self.std_scaler.fit_transform(
-            self.descriptor_PCA
-        )
+        self.std_scaler = None
+        self.descriptors_scaled['std'] = self._load_cached('std')
+        if self.descriptors_scaled['std'] is None:
+            self.std_scaler = self.backend.StandardScaler()
+            self.descriptors_scaled['std'] = self.std_scaler.fit_transform(
+                self.descriptor_PCA
+            )
+            self._save_cached('std', self.descriptors_scaled['std'])
     
     
     def get_norm_scaled_descriptor(self):
         """Get MinMax scaled data
         """
-        self.norm_scaler = MinMaxScaler()
-        self.descriptors_scaled['norm'] = self.norm_scaler.fit_transform(
-            self.descriptor_PCA
+        self.norm_scaler = None
+        self.descriptors_scaled['norm'] = self._load_cached('norm')
+        if self.descriptors_scaled['norm'] is None:
+            self.norm_scaler = self.backend.MinMaxScaler()
+            self.descriptors_scaled['norm'] = self.norm_scaler.fit_transform(
+                self.descriptor_PCA
+            )
+            self._save_cached('norm', self.descriptors_scaled['norm'])
+
+
+
+# Shared DataKeepers by backend name, created on the first request
+data_keepers = {}
+
+def get_data_keeper(backend='auto') -> DataKeeper:
+    """Get shared DataKeeper with default parameters. 
+    It is created (and "image_paths" are read) on the first call
+
+    Args:
+        backend (str or Backend): Array and ML backend. Defaults to 'auto'.
+
+    Returns:
+        DataKeeper: Shared DataKeeper
+    """
+    backend = get_backend(backend)
+    if backend.name not in data_keepers:
+        data_keepers[backend.name] = DataKeeper(backend=backend)
+    return data_keepers[backend.name]
+
+
+# GRID SEARCH SCHEDULER
+# Relative time cost of the clustering fit by rows n, features d and params
+cluster_costs = {
+    'KMeans': lambda n, d, params: n * d * params.get('n_clusters', 8),
+    'AgglomerativeClustering': lambda n, d, params: n**2 * d,
+    'DBSCAN': lambda n, d, params: n * np.log2(n+1) * d,
+    'HDBSCAN': lambda n, d, params: 
+        n * np.log2(n+1) * d * params.get('min_cluster_size', 5),
+}
+
+# Additional memory in bytes of the clustering fit (besides data)
+cluster_memory = {
+    'KMeans': lambda n, d, params: 8 * n * params.get('n_clusters', 8),
+    # Condensed distance matrix
+    'AgglomerativeClustering': lambda n, d, params: 4 * n**2,
+    # Neighborhoods and core distances
+    'DBSCAN': lambda n, d, params: 16 * n * params.get('min_samples', 5),
+    'HDBSCAN': lambda n, d, params: 
+        16 * n * (params.get('min_samples') or 
+                  params.get('min_cluster_size', 5)),
+}
+
+def get_params_rows(params_dict:dict, get_mesh:bool=True) -> list:
+    """Get parameters combinations of the grid
+
+    Args:
+        params_dict (dict): Parameter name - list of values
+        get_mesh (bool): Mesh grid or not. Defaults to True.
+
+    Returns:
+        list: Dicts of parameters
+    """
+    if get_mesh:
+        # Get parameters combination
+        mesh = np.meshgrid(
+            *list(params_dict.values())
+        )
+        params = np.hstack([x.reshape(-1, 1) for x in mesh])
+    else:
+        # If mesh does not required - construct columns
+        params = np.hstack(
+            [
+                np.array(x).reshape(-1,1) 
+                    for x in params_dict.values()
+            ]
         )
+    
+    params_rows = []
+    for param_row in params:
+        current_params = {}
+        # Get parameters dict from the parameters combination row
+        for i, key in enumerate(params_dict):
+            current_params[key] = param_row[i]
+        params_rows.append(current_params)
+    return params_rows
+
+
+def fit_cluster_model(
+    backend:Backend,
+    cluster_class,
+    current_params:dict,
+    X,
+) -> dict:
+    """Fit clustering model and get its labels and scores
+
+    Args:
+        backend (Backend): Array and ML backend
+        cluster_class (str or type): Class name or class
+        current_params (dict): Model parameters
+        X: Backend array of data
 
+    Returns:
+        dict: labels, n_clusters, calinski_harabasz_score 
+            and davies_bouldin_score
+    """
+    calinski_harabasz_score = lazy_import('calinski_harabasz_score')
+    davies_bouldin_score = lazy_import('davies_bouldin_score')
+    
+    # Init clust. model with curret params combination
+    cluster_model = backend.make_model(cluster_class, current_params)
+    cluster_model.fit(X)
+    labels = backend.to_numpy(cluster_model.labels_).copy()
+    cluster_model = None
+    n_clusters = len(np.unique(labels))
+    if n_clusters >= 2:
+        ch_score = calinski_harabasz_score(backend.to_numpy(X), labels)
+        db_score = davies_bouldin_score(backend.to_numpy(X), labels)
+    else:
+        ch_score = None
+        db_score = None
+    backend.free_memory()
+    return {
+        'labels': labels,
+        'n_clusters': n_clusters,
+        'calinski_harabasz_score': ch_score,
+        'davies_bouldin_score': db_score,
+    }
+
+
+def get_job_estimate(cluster_class_name:str, params:dict, X) -> tuple:
+    """Estimate relative time cost and memory of the clustering job
+
+    Args:
+        cluster_class_name (str): Class name
+        params (dict): Model parameters
+        X: Data
+
+    Returns:
+        tuple: (cost, memory in bytes)
+    """
+    n, d = X.shape
+    params = {key: value.item() if isinstance(value, np.generic) else value 
+              for key, value in params.items()}
+    cost = cluster_costs.get(
+        cluster_class_name, lambda n, d, params: n * d
+    )(n, d, params)
+    # Copy of data (e.g. centered or converted) and labels
+    memory = X.nbytes + 8 * n + cluster_memory.get(
+        cluster_class_name, lambda n, d, params: 0
+    )(n, d, params)
+    return cost, memory
+
+
+# Backend of the grid search worker process
+worker_backend = None
+
+def init_cluster_worker(n_threads:int):
+    """Init grid search worker: CPU backend with n_threads jobs 
+    and limits of BLAS/OpenMP threads to avoid oversubscription
+
+    Args:
+        n_threads (int): Number of threads of the worker
+    """
+    global worker_backend
+    from threadpoolctl import threadpool_limits
+    threadpool_limits(n_threads)
+    worker_backend = Backend('cpu', n_jobs=n_threads)
+
+
+def fit_shared_cluster_job(
+    shared_name:str,
+    shape:tuple,
+    dtype:str,
+    cluster_class,
+    current_params:dict,
+) -> dict:
+    """Fit clustering model in the worker on the data in shared memory
+
+    Args:
+        shared_name (str): Name of the shared memory block with data
+        shape (tuple): Data shape
+        dtype (str): Data dtype
+        cluster_class (str or type): Class name or class
+        current_params (dict): Model parameters
+
+    Returns:
+        dict: Result of fit_cluster_model
+    """
+    from multiprocessing import shared_memory
+    try:
+        # Block is unlinked by the main process only (Python 3.13+)
+        shared = shared_memory.SharedMemory(name=shared_name, track=False)
+    except TypeError:
+        shared = shared_memory.SharedMemory(name=shared_name)
+    try:
+        X = np.ndarray(shape, dtype=dtype, buffer=shared.buf)
+        X.flags.writeable = False
+        return fit_cluster_model(
+            worker_backend, cluster_class, current_params, X
+        )
+    finally:
+        X = None
+        shared.close()
+
+
+def run_cluster_jobs(
+    jobs:list,
+    X_dict:dict,
+    n_workers:int,
+    memory_limit:int=None,
+) -> list:
+    """Run clustering jobs on the process pool. Data is shared with 
+    workers by shared memory. The most expensive jobs are started first, 
+    the job is started only if estimated memory of the running jobs 
+    is within memory_limit (a single job is always started).
+
+    Args:
+        jobs (list): Tuples (cluster_class, cluster_class_name, 
+            scaler_name, current_params)
+        X_dict (dict): Scaler name - data in RAM
+        n_workers (int): Number of worker processes
+        memory_limit (int, optional): Memory budget of the running jobs 
+            in bytes. Defaults to None - 80% of the available memory.
+
+    Returns:
+        list: Results of fit_cluster_model in the jobs order
+    """
+    from concurrent.futures import ProcessPoolExecutor, wait, \
+        FIRST_COMPLETED
+    from multiprocessing import shared_memory
+    
+    if memory_limit is None:
+        try:
+            import psutil
+            memory_limit = 0.8 * psutil.virtual_memory().available
+        except ImportError:
+            memory_limit = np.inf
+    
+    # Expensive jobs first
+    estimates = [
+        get_job_estimate(cluster_class_name, current_params, 
+                         X_dict[scaler_name])
+        for _, cluster_class_name, scaler_name, current_params in jobs
+    ]
+    pending = sorted(range(len(jobs)), key=lambda i: -estimates[i][0])
+    results = [None] * len(jobs)
+    
+    shared_blocks = {}
+    try:
+        # Put data to shared memory once
+        for scaler_name, X in X_dict.items():
+            shared = shared_memory.SharedMemory(
+                create=True, size=max(X.nbytes, 1)
+            )
+            shared_blocks[scaler_name] = shared
+            np.ndarray(X.shape, dtype=X.dtype, buffer=shared.buf)[:] = X
+        
+        n_threads = max(1, (os.cpu_count() or 1) // n_workers)
+        with ProcessPoolExecutor(
+            max_workers=n_workers,
+            initializer=init_cluster_worker,
+            initargs=(n_threads,),
+        ) as executor:
+            running = {}
+            used_memory = 0
+            while pending or running:
+                # Start jobs within workers count and memory budget
+                while pending and len(running) < n_workers:
+                    i = pending[0]
+                    memory = estimates[i][1]
+                    if running and used_memory + memory > memory_limit:
+                        break
+                    pending.pop(0)
+                    cluster_class, _, scaler_name, current_params = jobs[i]
+                    X = X_dict[scaler_name]
+                    future = executor.submit(
+                        fit_shared_cluster_job,
+                        shared_blocks[scaler_name].name, X.shape, 
+                        X.dtype.str, cluster_class, current_params,
+                    )
+                    running[future] = i
+                    used_memory += memory
+                
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    i = running.pop(future)
+                    used_memory -= estimates[i][1]
+                    results[i] = future.result()
+                    _, cluster_class_name, scaler_name, current_params = \
+                        jobs[i]
+                    print(cluster_class_name, scaler_name, current_params, 
+                          '\tDONE!')
+    finally:
+        for shared in shared_blocks.values():
+            shared.close()
+            shared.unlink()
+    return results
 
 
 def conduct_grid_search(
     selected_params:dict,
     get_mesh=True,
     scaler: list = ['norm', 'std'],
-    data_keeper:DataKeeper=DataKeeper(),
+    data_keeper:DataKeeper=None,
     data_fraction:float = 0.5,
     random_state:int = 42,
-    delay:float = 0.1,
+    delay:float = 0.0,
+    n_workers:int = 1,
+    memory_limit:int = None,
 ):
     """Conduct Grid Search according to the selected_params.
+    With n_workers > 1 (CPU backend only), parameters combinations 
+    are fitted on the process pool (see run_cluster_jobs).
 
     Args:
         selected_params (dict): Descriptor - ModelClass - 
-            dict of Class params for searching
+            dict of Class params for searching. ModelClass can be 
+            the class or its name (e.g. 'KMeans') in the backend
         get_mesh (bool): Mesh grid or not. Defaults to True.
         scaler (list): List of scalers to conduct grid search
         data_keeper (DataKeeper): Obj to get descriptors. 
-            Defaults to data_keeper.
+            Defaults to None - shared get_data_keeper().
         data_fraction (float): Fraction of the descriptor to load. 
             Defaults to 1.0.
         random_state (int, optional): Set random state for the random 
             generator. Defaults to None.
-        delay (float): Time delay while class is cleaning
+        delay (float): Additional time delay after the GPU memory 
+            cleaning up in sequential run. Defaults to 0.0.
+        n_workers (int): Number of worker processes. Defaults to 1 - 
+            sequential run in the current process.
+        memory_limit (int, optional): Memory budget of the running jobs 
+            in bytes. Defaults to None - 80% of the available memory.
 
     Returns:
         list: Cluster grid Search results
     """
+    if data_keeper is None:
+        data_keeper = get_data_keeper()
     
     cluster_results = []
+    backend = data_keeper.backend
+    if backend.name != 'cpu':
+        n_workers = 1
 
     for descriptor_name in selected_params:
         print(f'ДЕСКРИПТОР {descriptor_name}')
@@ -347,72 +1491,58 @@ def conduct_grid_search(
             data_keeper.get_std_scaled_descriptor()
         data_keeper.del_PCA() # Free up memory from PCA
         
-        
+        # Jobs in order of the results
+        jobs = []
         for cluster_class in selected_params[descriptor_name]:
-            print(f'Модель кластеризации: {cluster_class.__name__}')
+            cluster_class_name = getattr(
+                cluster_class, '__name__', cluster_class
+            )
+            params_dict = selected_params[descriptor_name][cluster_class]
             for scaler_name in data_keeper.descriptors_scaled:
-                print(f'Метод масштабирования: {scaler_name}')
-                # Prepare Data and params dict
-                X = data_keeper.descriptors_scaled[scaler_name]
-                params_dict = selected_params[descriptor_name][cluster_class]
+                for current_params in get_params_rows(params_dict, get_mesh):
+                    jobs.append((cluster_class, cluster_class_name, 
+                                 scaler_name, current_params))
+        
+        if n_workers > 1:
+            results = run_cluster_jobs(
+                jobs, data_keeper.descriptors_scaled, n_workers, 
+                memory_limit
+            )
+        else:
+            results = []
+            last_class, last_scaler = None, None
+            for cluster_class, cluster_class_name, scaler_name, \
+                current_params in jobs:
+                if cluster_class_name != last_class:
+                    if last_class is not None:
+                        print()
+                    print(f'Модель кластеризации: {cluster_class_name}')
+                    last_scaler = None
+                if scaler_name != last_scaler:
+                    print(f'Метод масштабирования: {scaler_name}')
+                last_class, last_scaler = cluster_class_name, scaler_name
                 
-                if get_mesh:
-                    # Get parameters combination
-                    mesh = np.meshgrid(
-                        *list(params_dict.values())
-                    )
-                    params = np.hstack([x.reshape(-1, 1) for x in mesh])
-                else:
-                    # If mesh does not required - construct columns
-                    params = np.hstack(
-                        [
-                            np.array(x).reshape(-1,1) 
-                                for x in params_dict.values()
-                        ]
-                    )
-
-                for param_row in params:
-                    current_params = {}
-                    # Get parameters dict from the parameters combination row
-                    for i, key in enumerate(params_dict):
-                        current_params[key] = param_row[i]
-                    
-                    print(current_params, end=' ...')
-                    # Init clust. model with curret params combination
-                    cluster_model = cluster_class(**current_params)
-                    cluster_model.fit(X)
-                    n_clusters = len(np.unique(cluster_model.labels_))
-                    if n_clusters >= 2:
-                        ch_score = calinski_harabasz_score(
-                            X.get(), 
-                            cluster_model.labels_.get()
-                        )
-                        db_score = davies_bouldin_score(
-                            X.get(), 
-                            cluster_model.labels_.get()
-                        )
-                    else:
-                        ch_score = None
-                        db_score = None
-                    
-                    cluster_results.append(
-                        {
-                        'descriptor': descriptor_name,
-                        'scaler': scaler_name,
-                        'cluster_class': cluster_class.__name__,
-                        'cluster_class_params': current_params,
-                        'labels': cluster_model.labels_.get().copy(),
-                        'n_clusters': n_clusters,
-                        'calinski_harabasz_score': ch_score,
-                        'davies_bouldin_score': db_score
-                        }
-                    )
-                    cluster_model = None
+                print(current_params, end=' ...')
+                results.append(fit_cluster_model(
+                    backend, cluster_class, current_params, 
+                    data_keeper.descriptors_scaled[scaler_name]
+                ))
+                if delay:
                     time.sleep(delay) # Delay for the GPU memory cleaning up
-                    cp._default_memory_pool.free_all_blocks()
-                    time.sleep(delay) # Delay for the GPU memory cleaning up
-                    print('\tDONE!')
+                print('\tDONE!')
             print()
+        
+        for (_, cluster_class_name, scaler_name, current_params), result \
+            in zip(jobs, results):
+            cluster_results.append(
+                {
+                'descriptor': descriptor_name,
+                'scaler': scaler_name,
+                'cluster_class': cluster_class_name,
+                'cluster_class_params': current_params,
+                **result,
+                }
+            )
         print()
     
     return cluster_results 
@@ -425,6 +1555,7 @@ def display_models(cluster_df, head_rows=None):
         cluster_df (pd.DataFrame): DataFrame to eject sorted data
         head_rows (int): number of rows to display
     """
+    display = lazy_import('display')
     for descriptor in cluster_df['descriptor'].unique():
         print(f'ДЕСКРИПТОР: {descriptor}')
         df = cluster_df[cluster_df['descriptor'] == descriptor]
@@ -450,6 +1581,8 @@ def countplot_clusters(cluster_df, sidesize=4):
             and obtained clusters
         sidesize (int): Width of the one plot. Defaults to 4.
     """
+    plt = lazy_import('plt')
+    sns = lazy_import('sns')
 
     for descriptor in cluster_df['descriptor'].unique():
         df = cluster_df[cluster_df['descriptor'] == descriptor]
@@ -480,7 +1613,7 @@ def countplot_clusters(cluster_df, sidesize=4):
 
 def get_cluster_visualization(
     cluster_df:pd.DataFrame,
-    data_keeper=DataKeeper(),
+    data_keeper:DataKeeper=None,
     n_components=2,
     thresh = None, # (-10, 10),
     sidesize=4,
@@ -489,11 +1622,16 @@ def get_cluster_visualization(
 
     Args:
         cluster_df (pd.DataFrame): DataFrame for visualization
-        data_keeper (DataKeeper): Object for data control. Defaults to DataKeeper().
+        data_keeper (DataKeeper): Object for data control. Defaults to None - shared get_data_keeper().
         n_components (int): Number of UMAP components. Defaults to 2.
         thresh (tuple): (Lower boundary, Upper boundary). Defaults to None.
         sidesize (int): Width of the image. Defaults to 4.
     """
+    plt = lazy_import('plt')
+    sns = lazy_import('sns')
+    lazy_import('Axes3D') # Register 3d projection
+    if data_keeper is None:
+        data_keeper = get_data_keeper()
     for descriptor in cluster_df['descriptor'].unique():
         df = cluster_df[cluster_df['descriptor'] == descriptor]
         if n_components == 2:
@@ -515,9 +1653,10 @@ def get_cluster_visualization(
         data_keeper.get_norm_scaled_descriptor()
         data_keeper.del_PCA()
         # Prepare data for visualization
-        umap = UMAP(n_components=n_components)
+        backend = data_keeper.backend
+        umap = backend.get_class('UMAP')(n_components=n_components)
         X = umap.fit_transform(data_keeper.descriptors_scaled['norm'])
-        X = X.get()
+        X = backend.to_numpy(X)
         # Get thresholded data
         if thresh:
             mask = ((X>thresh[0]) & (X<thresh[1])).all(axis=1)
@@ -557,3 +1696,9 @@ def get_cluster_visualization(
             ax.set_title(row_name)
         plt.tight_layout()
 
+
+
+# Star import exports all public names, backend classes (KMeans, PCA...) 
+# and lazy imported libraries (plt, sns...)
+__all__ = [name for name in globals() if not name.startswith('_')] \
+    + backend_class_names + list(lazy_imports)